@@ -0,0 +1,121 @@
+"""Benchmark de inicialização: tempo de import e do primeiro render em processos novos.
+
+Cada medição roda em um interpretador novo (como um container recém-criado),
+com o backend local (SQLite) e o Streamlit substituído pelo stub.
+
+Uso (a partir da raiz do repositório):
+
+    python benchmarks/bench_startup.py --repeat 5
+
+Os resultados vão para benchmarks/results/startup-<commit>.json.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+SRC = os.path.join(ROOT, "src")
+sys.path.append(SRC)
+sys.path.append(BENCH_DIR)
+
+from results_io import write_results
+
+
+_MEDIR = """
+import sys, time
+sys.path.append({bench_dir!r})
+{preparo}
+inicio = time.perf_counter()
+{codigo}
+print(round((time.perf_counter() - inicio) * 1000, 3))
+"""
+
+CENARIOS = {
+    # no servidor o Streamlit já está carregado quando o script roda
+    "import main": ("import streamlit", "import main"),
+    "import frontend.dashboard": ("import streamlit", "import frontend.dashboard"),
+    "primeiro render (dados + gráficos)": (
+        "import streamlit",
+        "import frontend.dashboard as d\n"
+        "from stubs import StreamlitStub\n"
+        "d.st = StreamlitStub()\n"
+        "d.VizReceitas().render()",
+    ),
+}
+
+
+def _env(db_dir: str) -> dict:
+    env = dict(os.environ)
+    env.update({"DATA_BACKEND": "sqlite", "LOCAL_DB_DIR": db_dir, "REFRESH_INTERVAL_SECONDS": "0", "LOG_LEVEL": "WARNING"})
+    return env
+
+
+def run_cenario(preparo: str, codigo: str, env: dict) -> float:
+    script = _MEDIR.format(bench_dir=BENCH_DIR, preparo=preparo, codigo=codigo)
+    saida = subprocess.run([sys.executable, "-c", script], cwd=SRC, env=env, capture_output=True, text=True, check=True)
+    return float(saida.stdout.strip().splitlines()[-1])
+
+
+def import_profile(env: dict, top: int = 15) -> list[dict]:
+    """Módulos importados por `import main` com maior tempo cumulativo (python -X importtime)"""
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import streamlit; import main"],
+        cwd=SRC, env=env, capture_output=True, text=True, check=True,
+    )
+
+    modulos = []
+    depois_do_streamlit = False
+    for linha in saida.stderr.splitlines():
+        if not linha.startswith("import time:"):
+            continue
+        _, cumulativo, nome = linha.removeprefix("import time:").split("|")
+        if not cumulativo.strip().isdigit():
+            continue  # cabeçalho
+        if not depois_do_streamlit:
+            # o Streamlit já está carregado no servidor; conta só o que vem depois dele
+            depois_do_streamlit = nome.strip() == "streamlit"
+            continue
+        modulos.append({"modulo": nome.strip(), "cumulativo_us": int(cumulativo)})
+
+    return sorted(modulos, key=lambda m: m["cumulativo_us"], reverse=True)[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", default="1_ano")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: benchmarks/results/startup-<commit>.json)")
+    args = parser.parse_args()
+
+    from database.backends import SQLiteBackend
+    from synthetic_data import SCALES, generate_tables, seed_backend
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as db_dir:
+        seed_backend(SQLiteBackend(db_dir), generate_tables(SCALES[args.scale]))
+        env = _env(db_dir)
+
+        for nome, (preparo, codigo) in CENARIOS.items():
+            tempos = [run_cenario(preparo, codigo, env) for _ in range(args.repeat)]
+            resultados.append({
+                "benchmark": nome,
+                "repeat": args.repeat,
+                "min_ms": min(tempos),
+                "median_ms": round(statistics.median(tempos), 3),
+                "mean_ms": round(statistics.fmean(tempos), 3),
+            })
+            print(f"{nome:<40} mediana {statistics.median(tempos):>9.1f} ms")
+
+        perfil = import_profile(env)
+
+    write_results(resultados, args.output, prefixo="startup-", scale=args.scale, import_profile=perfil)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""Teste de carga: várias sessões simultâneas contra um `streamlit run src/main.py`.
+
+Sobe o app num processo próprio, com o backend local (SQLite) e dados
+sintéticos, e abre N sessões pelo mesmo websocket que o navegador usa
+(cliente headless, sem renderizar nada). Cada sessão abre o app e depois
+faz uma mistura de ações (trocar o período, rerun sem mudança, clicar em
+"Atualizar dados") com uma pausa aleatória entre elas.
+
+Para cada número de sessões o relatório traz p50/p95/p99 da latência dos
+reruns (do envio até o fim do script), o pico de memória (RSS) do processo
+do Streamlit e quantas queries chegaram ao backend, contadas pelos logs
+JSON do PerfRecorder.
+
+Uso (a partir da raiz do repositório):
+
+    python benchmarks/load_test.py --sessions 1 5 10 20 --acoes 10
+
+Os resultados vão para benchmarks/results/load-<commit>.json.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+SRC = os.path.join(ROOT, "src")
+sys.path.append(SRC)
+sys.path.append(BENCH_DIR)
+
+from results_io import write_results
+
+
+PERIODOS = ["Últimos 7 dias", "Últimos 14 dias", "Últimos 30 dias", "Últimos 90 dias", "Todo período"]
+
+# ação -> peso na mistura
+ACOES = {
+    "periodo": 0.6,
+    "rerun": 0.3,
+    "atualizar": 0.1,
+}
+
+
+# ---- servidor ------------------------------------------------------------
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class AppServer:
+    """`streamlit run src/main.py` em segundo plano, com os logs JSON contados"""
+
+    def __init__(self, db_dir: str):
+        self.porta = _porta_livre()
+        self.queries = 0
+        self.erros_log = 0
+        self._lock = threading.Lock()
+
+        env = dict(os.environ)
+        env.update({
+            "DATA_BACKEND": "sqlite",
+            "LOCAL_DB_DIR": db_dir,
+            "REFRESH_INTERVAL_SECONDS": "0",
+            "LOG_LEVEL": "INFO",
+        })
+        self.processo = subprocess.Popen(
+            [
+                sys.executable, "-m", "streamlit", "run", os.path.join(SRC, "main.py"),
+                "--server.headless", "true",
+                "--server.port", str(self.porta),
+                "--browser.gatherUsageStats", "false",
+            ],
+            cwd=SRC, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        threading.Thread(target=self._ler_logs, daemon=True).start()
+
+    def _ler_logs(self) -> None:
+        for linha in self.processo.stderr:
+            try:
+                evento = json.loads(linha)
+            except ValueError:
+                if "Traceback" in linha:
+                    with self._lock:
+                        self.erros_log += 1
+                continue
+            if isinstance(evento, dict) and str(evento.get("secao", "")).startswith("query:"):
+                with self._lock:
+                    self.queries += 1
+
+    def esperar(self, timeout: float = 60) -> None:
+        limite = time.monotonic() + timeout
+        while time.monotonic() < limite:
+            if self.processo.poll() is not None:
+                raise RuntimeError("o streamlit terminou antes de ficar pronto")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.porta}/_stcore/health", timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise TimeoutError("o streamlit não respondeu ao health check")
+
+    def rss_mb(self) -> float:
+        try:
+            with open(f"/proc/{self.processo.pid}/status") as status:
+                for linha in status:
+                    if linha.startswith("VmRSS:"):
+                        return int(linha.split()[1]) / 1024
+        except OSError:
+            pass
+        return float("nan")
+
+    def parar(self) -> None:
+        self.processo.terminate()
+        try:
+            self.processo.wait(10)
+        except subprocess.TimeoutExpired:
+            self.processo.kill()
+
+
+class MemorySampler:
+    """Amostra o RSS do servidor em segundo plano e guarda o pico"""
+
+    def __init__(self, servidor: AppServer, intervalo: float = 0.1):
+        self.servidor = servidor
+        self.intervalo = intervalo
+        self.pico = servidor.rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.intervalo):
+            self.pico = max(self.pico, self.servidor.rss_mb())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+# ---- cliente -------------------------------------------------------------
+
+class Session:
+    """Uma aba do navegador: websocket do Streamlit falando BackMsg/ForwardMsg"""
+
+    def __init__(self, porta: int, timeout: float):
+        self.url = f"ws://127.0.0.1:{porta}/_stcore/stream"
+        self.timeout = timeout
+        self.conexao = None
+        self.periodo_id = None
+        self.botao_id = None
+        self.periodo = None
+
+    async def abrir(self) -> tuple[float, bool]:
+        from tornado.websocket import websocket_connect
+
+        self.conexao = await websocket_connect(self.url, subprotocols=["streamlit"])
+        return await self.rerun()
+
+    async def rerun(self, periodo: str | None = None, atualizar: bool = False) -> tuple[float, bool]:
+        """Envia um rerun com o estado dos widgets e espera o script terminar: (ms, houve erro)"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        # marca o rerun_script mesmo sem widgets (um BackMsg vazio é ignorado)
+        msg.rerun_script.SetInParent()
+        estados = msg.rerun_script.widget_states
+        if periodo is not None:
+            self.periodo = periodo
+        if self.periodo is not None and self.periodo_id:
+            estados.widgets.add(id=self.periodo_id, string_value=self.periodo)
+        if atualizar and self.botao_id:
+            estados.widgets.add(id=self.botao_id, trigger_value=True)
+
+        inicio = time.perf_counter()
+        await self.conexao.write_message(msg.SerializeToString(), binary=True)
+
+        erro = False
+        while True:
+            dados = await asyncio.wait_for(self.conexao.read_message(), self.timeout)
+            if dados is None:
+                raise ConnectionError("o servidor fechou o websocket")
+
+            resposta = ForwardMsg()
+            resposta.ParseFromString(dados)
+            tipo = resposta.WhichOneof("type")
+
+            if tipo == "delta" and resposta.delta.WhichOneof("type") == "new_element":
+                erro |= self._registrar(resposta.delta.new_element)
+            elif tipo == "script_finished":
+                status = resposta.script_finished
+                if status == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                return (time.perf_counter() - inicio) * 1000, erro or status == ForwardMsg.FINISHED_WITH_COMPILE_ERROR
+
+    def _registrar(self, elemento) -> bool:
+        tipo = elemento.WhichOneof("type")
+        if tipo == "selectbox" and elemento.selectbox.label == "Período":
+            self.periodo_id = elemento.selectbox.id
+        elif tipo == "button" and "Atualizar" in elemento.button.label:
+            self.botao_id = elemento.button.id
+        return tipo == "exception"
+
+    def fechar(self) -> None:
+        if self.conexao is not None:
+            self.conexao.close()
+
+
+async def run_session(porta: int, acoes: int, pausa: float, timeout: float, seed: int) -> list[tuple]:
+    """Abre o app e executa `acoes` interações; devolve (ação, ms, erro)"""
+    rng = random.Random(seed)
+    sessao = Session(porta, timeout)
+    latencias = []
+    try:
+        latencias.append(("abrir", *await sessao.abrir()))
+        for _ in range(acoes):
+            await asyncio.sleep(rng.uniform(0, pausa))
+            acao = rng.choices(list(ACOES), weights=list(ACOES.values()))[0]
+            if acao == "periodo":
+                resultado = await sessao.rerun(periodo=rng.choice(PERIODOS))
+            else:
+                resultado = await sessao.rerun(atualizar=acao == "atualizar")
+            latencias.append((acao, *resultado))
+    finally:
+        sessao.fechar()
+    return latencias
+
+
+# ---- relatório -----------------------------------------------------------
+
+def _percentis(valores: list[float]) -> dict:
+    if not valores:
+        return {}
+    return {
+        "p50_ms": round(float(np.percentile(valores, 50)), 1),
+        "p95_ms": round(float(np.percentile(valores, 95)), 1),
+        "p99_ms": round(float(np.percentile(valores, 99)), 1),
+        "max_ms": round(max(valores), 1),
+    }
+
+
+def run_level(servidor: AppServer, sessoes: int, acoes: int, pausa: float, timeout: float) -> dict:
+    queries_antes = servidor.queries
+    inicio = time.perf_counter()
+
+    async def todas():
+        return await asyncio.gather(*(
+            run_session(servidor.porta, acoes, pausa, timeout, seed) for seed in range(sessoes)
+        ))
+
+    with MemorySampler(servidor) as memoria:
+        latencias = [item for sessao in asyncio.run(todas()) for item in sessao]
+
+    duracao = time.perf_counter() - inicio
+    reruns = [ms for acao, ms, _ in latencias if acao != "abrir"]
+
+    return {
+        "sessoes": sessoes,
+        "reruns": len(latencias),
+        "erros": sum(1 for *_, erro in latencias if erro),
+        "reruns_por_s": round(len(latencias) / duracao, 2),
+        **_percentis(reruns),
+        "por_acao": {
+            acao: _percentis([ms for nome, ms, _ in latencias if nome == acao])
+            for acao in ["abrir", *ACOES]
+        },
+        "rss_pico_mb": round(memoria.pico, 1),
+        "queries_backend": servidor.queries - queries_antes,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 20])
+    parser.add_argument("--acoes", type=int, default=10, help="interações por sessão, além da abertura")
+    parser.add_argument("--pausa", type=float, default=0.5, help="pausa máxima (s) entre interações")
+    parser.add_argument("--timeout", type=float, default=120, help="tempo máximo (s) de um rerun")
+    parser.add_argument("--scale", default="1_ano")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: benchmarks/results/load-<commit>.json)")
+    args = parser.parse_args()
+
+    from database.backends import SQLiteBackend
+    from synthetic_data import SCALES, generate_tables, seed_backend
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as db_dir:
+        seed_backend(SQLiteBackend(db_dir), generate_tables(SCALES[args.scale]))
+
+        servidor = AppServer(db_dir)
+        try:
+            servidor.esperar()
+            rss_inicial = servidor.rss_mb()
+
+            for sessoes in args.sessions:
+                resultado = run_level(servidor, sessoes, args.acoes, args.pausa, args.timeout)
+                resultados.append(resultado)
+                print(
+                    f"{sessoes:>4} sessões  p50 {resultado.get('p50_ms', 0):>8.1f} ms  "
+                    f"p95 {resultado.get('p95_ms', 0):>8.1f} ms  p99 {resultado.get('p99_ms', 0):>8.1f} ms  "
+                    f"RSS {resultado['rss_pico_mb']:>7.1f} MB  queries {resultado['queries_backend']:>4}  "
+                    f"erros {resultado['erros']}"
+                )
+        finally:
+            servidor.parar()
+
+    write_results(
+        resultados, args.output, prefixo="load-",
+        scale=args.scale, acoes=args.acoes, pausa=args.pausa, mistura=ACOES,
+        rss_inicial_mb=round(rss_inicial, 1), tracebacks_servidor=servidor.erros_log,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""Gravação dos resultados dos benchmarks em benchmarks/results/."""
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+def write_results(results: list[dict], output: str | None = None, prefixo: str = "", **extra) -> dict:
+    """Grava {commit, timestamp, ambiente, results} em JSON e devolve o dicionário"""
+    commit = git_commit()
+    saida = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **extra,
+        "results": results,
+    }
+
+    output = output or os.path.join(RESULTS_DIR, f"{prefixo}{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(saida, f, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em {output}")
+    return saida
@@ -0,0 +1,213 @@
+"""Benchmarks do pipeline de ingestão e do dashboard com dados sintéticos.
+
+Uso (a partir da raiz do repositório):
+
+    python benchmarks/run_benchmarks.py                    # todas as escalas
+    python benchmarks/run_benchmarks.py --scales 1_mes 1_ano
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<commit>.json
+
+Os resultados vão para benchmarks/results/<commit>.json, para comparar
+regressões entre commits.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "src"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import frontend.dashboard as dashboard
+from database.backends import SQLiteBackend
+from database.query_cache import get_query_executor
+from queries.data_store import get_data_store
+from queries.romaneio import BuildDataFrames, ProcessRomaneio, convert_types
+
+from results_io import write_results
+from stubs import StreamlitStub
+from synthetic_data import SCALES, generate_romaneio_texts, generate_tables, seed_backend
+
+
+PERIODOS = ["Últimos 30 dias", "Todo período"]
+
+SECOES = [
+    "show_kpis",
+    "show_receitas_evolution",
+    "show_despesas_evolution",
+    "show_despesas_breakdown",
+    "show_weekday_analysis",
+    "show_faturamento_analysis",
+    "show_notas_analysis",
+    "show_cep_analysis",
+    "show_data_table",
+]
+
+# limite padrão (em %) acima do qual --compare acusa regressão
+LIMITE_REGRESSAO = 20.0
+
+
+def measure(func, repeat: int) -> dict:
+    tempos = []
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+
+    return {
+        "repeat": repeat,
+        "min_ms": round(min(tempos), 3),
+        "median_ms": round(statistics.median(tempos), 3),
+        "mean_ms": round(statistics.fmean(tempos), 3),
+    }
+
+
+def bench_ingestao(scale, repeat: int) -> list[dict]:
+    textos = generate_romaneio_texts(min(scale.dias, 1000))
+
+    def processar():
+        return [ProcessRomaneio(texto, year=ano).process() for texto, ano in textos]
+
+    romaneios = processar()
+
+    def montar_dataframes():
+        for romaneio in romaneios:
+            builder = BuildDataFrames(romaneio)
+            convert_types(builder.build_df_receitas(), ["DATA", "CREATED_AT"])
+            convert_types(builder.build_df_despesas(), ["DATA", "CREATED_AT"])
+            convert_types(builder.build_df_peso_notas(), ["DATA", "CREATED_AT"])
+
+    return [
+        {"benchmark": "ProcessRomaneio.process", "n": len(textos), **measure(processar, repeat)},
+        {"benchmark": "BuildDataFrames+convert_types", "n": len(textos), **measure(montar_dataframes, repeat)},
+    ]
+
+
+def bench_dashboard(scale, repeat: int) -> list[dict]:
+    tabelas = generate_tables(scale)
+    dashboard.st = StreamlitStub()
+
+    # backend local no lugar do BigQuery, selecionado pela configuração
+    with tempfile.TemporaryDirectory() as db_dir:
+        seed_backend(SQLiteBackend(db_dir), tabelas)
+        os.environ["DATA_BACKEND"] = "sqlite"
+        os.environ["LOCAL_DB_DIR"] = db_dir
+        os.environ["REFRESH_INTERVAL_SECONDS"] = "0"
+
+        n = len(tabelas["RECEITAS"])
+        store = get_data_store()
+
+        def recarregar_sem_cache():
+            # mede a leitura do banco, não o cache de queries
+            get_query_executor().cache.clear()
+            store.reload()
+
+        # carga a partir das tabelas brutas e a partir do resumo diário (padrão)
+        os.environ["USE_ROLLUPS"] = "0"
+        resultados = [
+            {"benchmark": "SharedDataStore.reload (bruto)", "n": n, **measure(recarregar_sem_cache, repeat)},
+        ]
+        os.environ["USE_ROLLUPS"] = "1"
+        resultados.append(
+            {"benchmark": "SharedDataStore.reload (resumo)", "n": n, **measure(recarregar_sem_cache, repeat)},
+        )
+        # "Atualizar dados" sem gravação nova: as queries saem do cache
+        resultados.append(
+            {"benchmark": "SharedDataStore.reload (cache de queries)", "n": n, **measure(store.reload, repeat)},
+        )
+
+        viz = dashboard.VizReceitas()
+        viz.reload_data()
+
+        # ainda dentro do diretório temporário: o índice de CEPs (só as colunas de faixa) e o drill-down leem o banco sob demanda
+        for periodo in PERIODOS:
+            viz.periodo = periodo
+            resultados.append({
+                "benchmark": "apply_period_filter", "periodo": periodo, "n": n,
+                **measure(viz.apply_period_filter, repeat),
+            })
+
+            for secao in SECOES:
+                resultados.append({
+                    "benchmark": f"VizReceitas.{secao}", "periodo": periodo, "n": n,
+                    **measure(getattr(viz, secao), repeat),
+                })
+
+        if scale.rotas > 1:
+            # visão de uma rota: só a partição dela (recortes, índice de CEPs, médias móveis, drill-down)
+            frota = store.get()
+            viz.rota = frota.rotas()[0]
+            viz.snapshot = frota.rota(viz.rota)
+            n_rota = len(viz.snapshot.receitas)
+            for periodo in PERIODOS:
+                viz.periodo = periodo
+                resultados.append({
+                    "benchmark": "apply_period_filter (rota)", "periodo": periodo, "n": n_rota,
+                    **measure(viz.apply_period_filter, repeat),
+                })
+
+                for secao in SECOES:
+                    resultados.append({
+                        "benchmark": f"VizReceitas.{secao} (rota)", "periodo": periodo, "n": n_rota,
+                        **measure(getattr(viz, secao), repeat),
+                    })
+
+    return resultados
+
+
+def _chave(resultado: dict) -> tuple:
+    return resultado["scale"], resultado["benchmark"], resultado.get("periodo", "")
+
+
+def compare(atual: dict, base_path: str, limite: float) -> int:
+    """Compara as medianas com um arquivo de resultados anterior"""
+    with open(base_path, encoding="utf-8") as f:
+        base = json.load(f)
+
+    base_por_chave = {_chave(r): r for r in base["results"]}
+    regressoes = 0
+
+    print(f"\n{'benchmark':<70} {'base ms':>10} {'atual ms':>10} {'var %':>8}")
+    for resultado in atual["results"]:
+        anterior = base_por_chave.get(_chave(resultado))
+        if not anterior or not anterior["median_ms"]:
+            continue
+
+        variacao = (resultado["median_ms"] / anterior["median_ms"] - 1) * 100
+        marca = " <-- regressão" if variacao > limite else ""
+        regressoes += bool(marca)
+
+        nome = " ".join(str(p) for p in _chave(resultado) if p)
+        print(f"{nome:<70} {anterior['median_ms']:>10.2f} {resultado['median_ms']:>10.2f} {variacao:>8.1f}{marca}")
+
+    return 1 if regressoes else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="arquivo JSON de uma execução anterior para comparação")
+    parser.add_argument("--threshold", type=float, default=LIMITE_REGRESSAO, help="regressão máxima aceita em %%")
+    args = parser.parse_args()
+
+    resultados = []
+    for nome in args.scales:
+        scale = SCALES[nome]
+        print(f"[{nome}] rodando...", flush=True)
+        for resultado in bench_ingestao(scale, args.repeat) + bench_dashboard(scale, args.repeat):
+            resultados.append({"scale": nome, **resultado})
+
+    saida = write_results(resultados, args.output)
+
+    if args.compare:
+        return compare(saida, args.compare, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Popula o backend local (SQLite) com dados sintéticos para demos e testes de carga.
+
+Uso (a partir da raiz do repositório):
+
+    python benchmarks/seed_local_db.py --scale 1_ano --db-dir data
+    DATA_BACKEND=sqlite LOCAL_DB_DIR=data streamlit run src/main.py
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "src"))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database.backends import SQLiteBackend
+
+from synthetic_data import SCALES, generate_tables, seed_backend
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=list(SCALES), default="1_ano")
+    parser.add_argument("--db-dir", default=os.path.join(ROOT, "data"))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    arquivo = os.path.join(args.db_dir, "SBOX_ISRAEL.sqlite")
+    if os.path.exists(arquivo):
+        print(f"{arquivo} já existe; apague-o para gerar novamente")
+        return 1
+
+    tabelas = generate_tables(SCALES[args.scale], seed=args.seed)
+    seed_backend(SQLiteBackend(args.db_dir), tabelas)
+
+    for tabela, df in tabelas.items():
+        print(f"SBOX_ISRAEL.{tabela}: {len(df)} linhas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Substituto do Streamlit usado nos benchmarks."""
+
+
+class _Noop:
+    """Objeto que aceita qualquer chamada, atributo ou bloco `with`"""
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __getattr__(self, nome):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        return iter(())
+
+    def __bool__(self):
+        return False
+
+
+class StreamlitStub:
+    """Imita a API do Streamlit usada pelo VizReceitas sem renderizar nada.
+
+    As figuras passadas para plotly_chart são contadas, para que o benchmark
+    inclua a construção dos gráficos mas não a serialização para o navegador.
+    """
+
+    def __init__(self, selectbox_value=None):
+        self._noop = _Noop()
+        self.selectbox_value = selectbox_value
+        self.query_params = {}
+        self.session_state = {}
+        self.figuras = 0
+
+    def __getattr__(self, nome):
+        return self._noop
+
+    def columns(self, spec, **kwargs):
+        n = spec if isinstance(spec, int) else len(spec)
+        return [_Noop() for _ in range(n)]
+
+    def tabs(self, nomes):
+        return [_Noop() for _ in nomes]
+
+    def selectbox(self, label, options, **kwargs):
+        return self.selectbox_value if self.selectbox_value is not None else options[0]
+
+    def button(self, *args, **kwargs):
+        return False
+
+    def number_input(self, label, value=None, **kwargs):
+        return value if value is not None else kwargs.get("min_value", 0)
+
+    def plotly_chart(self, fig, **kwargs):
+        self.figuras += 1
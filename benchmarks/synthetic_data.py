@@ -0,0 +1,161 @@
+"""Gerador de dados sintéticos no formato das tabelas de SBOX_ISRAEL.
+
+Produz RECEITAS, DESPESAS e PESO_NOTAS (já com os tipos de convert_types)
+e textos de romaneio no mesmo formato colado no ingestao.ipynb.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+VALOR_NOTA_LEVE = 27.40
+VALOR_NOTA_PESADA = 36.50
+
+# categoria -> (probabilidade de aparecer no dia, valor médio, desvio)
+DESPESAS = {
+    "Pedágio": (0.9, 27.40, 4.0),
+    "Café": (0.6, 18.0, 5.0),
+    "Almoço": (0.85, 55.0, 12.0),
+    "Abastecimento": (0.5, 420.0, 80.0),
+}
+
+
+@dataclass(frozen=True)
+class Scale:
+    nome: str
+    dias: int
+    rotas: int = 1
+
+
+SCALES = {
+    "1_mes": Scale("1_mes", 30),
+    "1_ano": Scale("1_ano", 365),
+    "10_anos": Scale("10_anos", 3650),
+    "1_ano_50_rotas": Scale("1_ano_50_rotas", 365, rotas=50),
+}
+
+
+def _datas(dias: int, fim: pd.Timestamp | None = None) -> pd.DatetimeIndex:
+    fim = (fim or pd.Timestamp.now()).normalize()
+    datas = pd.date_range(end=fim, periods=dias, freq="D")
+    # sem entregas aos domingos
+    return datas[datas.dayofweek != 6]
+
+
+def generate_tables(scale: Scale, seed: int = 42) -> dict[str, pd.DataFrame]:
+    """Gera as três tabelas para a escala pedida.
+
+    Com mais de uma rota, cada dia recebe um romaneio por rota (coluna ROTA),
+    o que simula várias operações gravando na mesma data. Com uma só, todos
+    os romaneios ficam na rota padrão.
+    """
+    from queries.romaneio import ROTA_PADRAO
+
+    rng = np.random.default_rng(seed)
+
+    datas = _datas(scale.dias)
+    rotas = [f"ROTA_{i:02d}" for i in range(scale.rotas)] if scale.rotas > 1 else [ROTA_PADRAO]
+
+    idx = pd.MultiIndex.from_product([datas, rotas], names=["DATA", "ROTA"]).to_frame(index=False)
+    n = len(idx)
+
+    total_notas = rng.integers(15, 45, n)
+    realizadas = total_notas - rng.binomial(3, 0.3, n)
+    realizadas = np.maximum(realizadas, 0)
+    notas_leves = rng.binomial(realizadas, 0.35)
+    notas_pesadas = realizadas - notas_leves
+    fat_leve = np.round(notas_leves * VALOR_NOTA_LEVE, 2)
+    fat_pesada = np.round(notas_pesadas * VALOR_NOTA_PESADA, 2)
+
+    cep_inicio = rng.integers(10, 90, n)
+    cep_fim = cep_inicio + rng.integers(0, 6, n)
+    ceps = [f"{a:03d}-{b:03d}" for a, b in zip(cep_inicio, cep_fim)]
+
+    # romaneios são gravados no próprio dia (como no ingestao.ipynb)
+    created_at = idx["DATA"]
+
+    receitas = pd.DataFrame({
+        "DATA": idx["DATA"],
+        "ROTA": idx["ROTA"],
+        "TOTAL_NOTAS": total_notas.astype(int),
+        "NOTAS_REALIZADAS": realizadas.astype(int),
+        "VALOR_TOTAL": (fat_leve + fat_pesada).astype(float),
+        "CEPS": ceps,
+        "CEP_INICIO": cep_inicio.astype(int),
+        "CEP_FIM": cep_fim.astype(int),
+        "CREATED_AT": created_at,
+    })
+
+    peso_notas = pd.DataFrame({
+        "DATA": idx["DATA"],
+        "ROTA": idx["ROTA"],
+        "NOTAS_LEVES": notas_leves.astype(int),
+        "NOTAS_PESADAS": notas_pesadas.astype(int),
+        "FAT_NOTA_LEVE": fat_leve.astype(float),
+        "FAT_NOTA_PESADA": fat_pesada.astype(float),
+        "CREATED_AT": created_at,
+    })
+
+    partes = []
+    for categoria, (prob, media, desvio) in DESPESAS.items():
+        presente = rng.random(n) < prob
+        valores = np.round(np.abs(rng.normal(media, desvio, presente.sum())), 2)
+        partes.append(pd.DataFrame({
+            "DATA": idx["DATA"][presente].to_numpy(),
+            "ROTA": idx["ROTA"][presente].to_numpy(),
+            "CATEGORIA": categoria,
+            "VALOR": valores.astype(float),
+            "CREATED_AT": created_at[presente].to_numpy(),
+        }))
+    despesas = pd.concat(partes, ignore_index=True).sort_values("DATA", ignore_index=True)
+
+    return {"RECEITAS": receitas, "DESPESAS": despesas, "PESO_NOTAS": peso_notas}
+
+
+def _moeda(valor: float) -> str:
+    return f"{valor:.2f}".replace(".", ",")
+
+
+def generate_romaneio_texts(quantidade: int, seed: int = 42) -> list[tuple[str, int]]:
+    """Gera (texto, ano) de romaneios no formato recebido por mensagem"""
+    rng = np.random.default_rng(seed)
+    datas = pd.date_range(end=pd.Timestamp.now().normalize(), periods=quantidade, freq="D")
+
+    textos = []
+    for data in datas:
+        leves = int(rng.integers(5, 20))
+        pesadas = int(rng.integers(8, 25))
+        total = leves + pesadas + int(rng.integers(0, 3))
+        fat_leve = leves * VALOR_NOTA_LEVE
+        fat_pesada = pesadas * VALOR_NOTA_PESADA
+        cep_inicio = int(rng.integers(10, 90))
+        cep_fim = cep_inicio + int(rng.integers(0, 6))
+
+        linhas = [
+            f"Romaneio {data.day:02d}/{data.month:02d}",
+            f"Total de notas {total}",
+            f"Realizadas {leves + pesadas}",
+            f"{leves} notas a ${_moeda(VALOR_NOTA_LEVE)}..${_moeda(fat_leve)}",
+            f"{pesadas} notas a ${_moeda(VALOR_NOTA_PESADA)}..${_moeda(fat_pesada)}",
+            f"Total ${_moeda(fat_leve + fat_pesada)}",
+        ]
+        for categoria, (prob, media, desvio) in DESPESAS.items():
+            if rng.random() < prob:
+                linhas.append(f"{categoria} ${_moeda(abs(rng.normal(media, desvio)))}")
+        linhas.append(f"Ceps {cep_inicio:03d} ao {cep_fim:03d}.")
+
+        textos.append(("\n".join(linhas) + "\n", data.year))
+
+    return textos
+
+
+def seed_backend(backend, tables: dict[str, pd.DataFrame], dataset: str = "SBOX_ISRAEL", resumos: bool = True) -> None:
+    """Grava as tabelas geradas em um DataBackend (ex.: SQLiteBackend local)"""
+    from queries.rollups import rebuild_rollups
+
+    for tabela, df in tables.items():
+        backend.append_df(df, f"{dataset}.{tabela}")
+
+    if resumos:
+        rebuild_rollups(backend)
@@ -0,0 +1,240 @@
+"""API JSON somente leitura com as métricas do dashboard.
+
+Serve os mesmos KPIs, série diária e despesas por categoria do VizReceitas,
+lidos do SharedDataStore do processo (não faz query própria). Cada resposta
+leva um ETag com a versão dos dados; quem repete a consulta com
+If-None-Match recebe 304 sem corpo enquanto a versão não mudar.
+
+Rotas (todas aceitam ?periodo=7d|14d|30d|90d|todo):
+
+    GET /api/versao
+    GET /api/kpis
+    GET /api/serie-diaria
+    GET /api/despesas-categorias
+
+Junto do dashboard, sobe na porta METRICS_API_PORT (não sobe se vazio),
+em METRICS_API_HOST (padrão 127.0.0.1: a API não tem autenticação, então
+só é exposta na rede se isso for pedido explicitamente). Sozinho, a partir
+de src/:
+
+    python -m api.metrics_api --port 8502
+"""
+import argparse
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from database.db_connection import get_setting
+from frontend import metrics
+from monitoring.instrumentation import timed
+from queries.data_store import SharedDataStore, get_data_store
+
+
+logger = logging.getLogger("dashboard.api")
+
+# respostas prontas guardadas por ETag (corpo JSON já serializado)
+MAX_RESPOSTAS = 256
+
+# sem autenticação: por padrão só atende a própria máquina
+HOST_PADRAO = "127.0.0.1"
+
+
+def _registros(df: pd.DataFrame) -> list[dict]:
+    df = df.copy()
+    for coluna in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            df[coluna] = df[coluna].dt.strftime("%Y-%m-%d")
+    return json.loads(df.round(2).to_json(orient="records", force_ascii=False))
+
+
+def _kpis(rec, desp, peso) -> dict:
+    return {chave: round(valor, 2) for chave, valor in metrics.compute_kpis(rec, desp).items()}
+
+
+def _serie_diaria(rec, desp, peso) -> list[dict]:
+    return _registros(metrics.daily_series(rec, desp))
+
+
+def _despesas_categorias(rec, desp, peso) -> list[dict]:
+    return _registros(metrics.despesas_por_categoria(desp))
+
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """If-None-Match casa com o ETag: "*" ou algum validador da lista (comparação fraca, ignora W/)"""
+    if not if_none_match:
+        return False
+
+    validadores = [valor.strip() for valor in if_none_match.split(",")]
+    if "*" in validadores:
+        return True
+    return any(valor.removeprefix("W/") == etag.removeprefix("W/") for valor in validadores)
+
+
+ROTAS = {
+    "/api/kpis": _kpis,
+    "/api/serie-diaria": _serie_diaria,
+    "/api/despesas-categorias": _despesas_categorias,
+}
+
+
+class MetricsApi:
+    """Monta as respostas a partir da versão atual do data store.
+
+    O ETag combina a versão dos dados, a rota, o período e o dia atual
+    (os períodos "últimos N dias" andam com o calendário mesmo sem dados
+    novos). Respostas com o mesmo ETag são calculadas uma vez só.
+    """
+
+    def __init__(self, store: SharedDataStore):
+        self.store = store
+        self._respostas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def etag(self, version: int, rota: str, periodo: str) -> str:
+        chave = f"{rota}|{metrics.period_slug(periodo)}|{date.today().isoformat()}"
+        return f'"v{version}-{hashlib.sha1(chave.encode()).hexdigest()[:12]}"'
+
+    def handle(self, rota: str, periodo: str, if_none_match: str | None) -> tuple[int, dict, bytes]:
+        """(status, cabeçalhos, corpo) para GET rota; ValueError/KeyError para rota ou período inválido"""
+        snapshot = self.store.get()
+        etag = self.etag(snapshot.version, rota, periodo)
+        cabecalhos = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if etag_matches(etag, if_none_match):
+            return 304, cabecalhos, b""
+
+        with self._lock:
+            corpo = self._respostas.get(etag)
+            if corpo is not None:
+                self._respostas.move_to_end(etag)
+
+        if corpo is None:
+            corpo = self._build(snapshot, rota, periodo)
+            with self._lock:
+                self._respostas[etag] = corpo
+                while len(self._respostas) > MAX_RESPOSTAS:
+                    self._respostas.popitem(last=False)
+
+        return 200, cabecalhos, corpo
+
+    def _build(self, snapshot, rota: str, periodo: str) -> bytes:
+        with timed(f"api:{rota}", periodo=periodo):
+            if rota == "/api/versao":
+                dados = {"loaded_at": snapshot.loaded_at.isoformat(timespec="seconds"), "fonte": snapshot.fonte}
+            else:
+                funcao = ROTAS[rota]
+                data_inicio = metrics.period_start(periodo, snapshot.receitas)
+                dados = funcao(*snapshot.since(data_inicio))
+
+            conteudo = {"versao": snapshot.version, "periodo": metrics.period_slug(periodo), "dados": dados}
+            return json.dumps(conteudo, ensure_ascii=False).encode("utf-8")
+
+
+def _handler(api: MetricsApi):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            periodo = parse_qs(url.query).get("periodo", [None])[0]
+
+            if url.path != "/api/versao" and url.path not in ROTAS:
+                return self._erro(404, f"rota desconhecida: {url.path}")
+            try:
+                status, cabecalhos, corpo = api.handle(url.path, metrics.parse_periodo(periodo), self.headers.get("If-None-Match"))
+            except ValueError as erro:
+                return self._erro(400, str(erro))
+            except Exception:
+                # falha ao carregar os dados (backend/BigQuery): responde em vez de derrubar a conexão
+                logger.exception(f"erro ao responder {self.path}")
+                return self._erro(500, "erro interno ao carregar as métricas")
+
+            self.send_response(status)
+            for nome, valor in cabecalhos.items():
+                self.send_header(nome, valor)
+            if corpo:
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def _erro(self, status: int, mensagem: str):
+            corpo = json.dumps({"erro": mensagem}, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, formato, *args):
+            logger.debug(formato % args)
+
+    return MetricsHandler
+
+
+def create_server(store: SharedDataStore, host: str = HOST_PADRAO, port: int = 8502) -> ThreadingHTTPServer:
+    servidor = ThreadingHTTPServer((host, port), _handler(MetricsApi(store)))
+    servidor.daemon_threads = True
+    return servidor
+
+
+_servidor: ThreadingHTTPServer | None = None
+_servidor_iniciado = False
+_servidor_lock = threading.Lock()
+
+
+def start_metrics_api(store: SharedDataStore) -> ThreadingHTTPServer | None:
+    """Sobe (uma vez por processo) a API na porta METRICS_API_PORT, em segundo plano"""
+    global _servidor, _servidor_iniciado
+
+    porta = get_setting("METRICS_API_PORT", "")
+    if not porta:
+        return None
+    host = get_setting("METRICS_API_HOST", HOST_PADRAO)
+
+    with _servidor_lock:
+        if not _servidor_iniciado:
+            # uma tentativa só: reruns seguintes não insistem numa porta ocupada
+            _servidor_iniciado = True
+            try:
+                _servidor = create_server(store, host, int(porta))
+            except OSError:
+                # porta ocupada (outro processo do dashboard já serve a API)
+                logger.exception(f"não foi possível abrir a API na porta {porta}")
+                return None
+            threading.Thread(target=_servidor.serve_forever, name="metrics-api", daemon=True).start()
+            logger.info(f"API de métricas em http://{host}:{porta}/api/kpis")
+    return _servidor
+
+
+def main() -> int:
+    from monitoring.instrumentation import configure_logging
+    from queries.refresher import start_refresher
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=get_setting("METRICS_API_HOST", HOST_PADRAO),
+                        help="interface (padrão: METRICS_API_HOST ou 127.0.0.1; 0.0.0.0 expõe a API sem autenticação)")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args()
+
+    configure_logging()
+    store = get_data_store()
+    store.get()
+    start_refresher(store)
+
+    servidor = create_server(store, args.host, args.port)
+    logger.info(f"API de métricas em http://{args.host}:{args.port}/api/kpis")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,337 @@
+import os
+import re
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+from monitoring.instrumentation import record_query_job, timed
+
+
+class DataBackend(ABC):
+    """Interface comum de leitura/escrita das tabelas (DATASET.TABELA).
+
+    As queries usam a sintaxe do BigQuery, com parâmetros nomeados no
+    formato @nome; cada implementação traduz o que for preciso.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def query(self, sql: str, params: dict | None = None, nome: str = "query") -> pd.DataFrame:
+        ...
+
+    @abstractmethod
+    def append_df(self, df: pd.DataFrame, table_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def table_metadata(self, table_id: str) -> dict:
+        """Metadados baratos para detectar mudanças: num_rows e modified"""
+        ...
+
+    @abstractmethod
+    def table_exists(self, table_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def table_columns(self, table_id: str) -> list[str]:
+        """Colunas da tabela (só metadados, sem ler linhas)"""
+        ...
+
+    @abstractmethod
+    def replace_df(self, df: pd.DataFrame, table_id: str) -> None:
+        """Substitui todo o conteúdo de table_id por df (cria se não existir)"""
+        ...
+
+    def estimate_bytes(self, sql: str, params: dict | None = None) -> int | None:
+        """Bytes que a query processaria (dry run); None se o backend não estima"""
+        return None
+
+    @abstractmethod
+    def merge_sum(self, df: pd.DataFrame, table_id: str, chaves: list[str], soma: list[str]) -> None:
+        """Upsert por `chaves`: colunas em `soma` são somadas ao que já existe,
+        as demais são substituídas. Cria a tabela se não existir."""
+        ...
+
+
+class BigQueryBackend(DataBackend):
+    name = "bigquery"
+
+    def __init__(self, client, maximum_bytes_billed: int | None = None):
+        self.client = client
+        # limite do próprio BigQuery: a query falha em vez de cobrar acima disso
+        self.maximum_bytes_billed = maximum_bytes_billed
+
+    def _job_config(self, params: dict | None, dry_run: bool = False):
+        from google.cloud import bigquery
+
+        if not params and not self.maximum_bytes_billed and not dry_run:
+            return None
+
+        tipos = {bool: "BOOL", int: "INT64", float: "FLOAT64", str: "STRING"}
+        query_params = []
+        for chave, valor in (params or {}).items():
+            if isinstance(valor, pd.Timestamp):
+                query_params.append(bigquery.ScalarQueryParameter(chave, "DATE", valor.date()))
+            else:
+                query_params.append(bigquery.ScalarQueryParameter(chave, tipos.get(type(valor), "STRING"), valor))
+
+        job_config = bigquery.QueryJobConfig(query_parameters=query_params)
+        if self.maximum_bytes_billed:
+            job_config.maximum_bytes_billed = self.maximum_bytes_billed
+        if dry_run:
+            job_config.dry_run = True
+            # com o cache ligado o dry run estima 0 bytes para uma query que já esteve no cache
+            job_config.use_query_cache = False
+        return job_config
+
+    def estimate_bytes(self, sql: str, params: dict | None = None) -> int | None:
+        job = self.client.query(sql, job_config=self._job_config(params, dry_run=True))
+        return job.total_bytes_processed
+
+    def query(self, sql: str, params: dict | None = None, nome: str = "query") -> pd.DataFrame:
+        # tempo da query (execução no BigQuery) separado da conversão para DataFrame
+        inicio = time.perf_counter()
+        job = self.client.query(sql, job_config=self._job_config(params))
+        job.result()
+        record_query_job(nome, job, (time.perf_counter() - inicio) * 1000)
+
+        with timed(f"to_dataframe:{nome}"):
+            df = job.to_dataframe()
+
+        return df
+
+    def append_df(self, df: pd.DataFrame, table_id: str) -> None:
+        from google.cloud import bigquery
+
+        job_config = bigquery.LoadJobConfig(
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+            # colunas novas (ex.: CEP_INICIO/CEP_FIM) entram como NULLABLE nas linhas antigas
+            schema_update_options=[bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION],
+        )
+
+        job = self.client.load_table_from_dataframe(
+            df,
+            table_id,
+            job_config=job_config,
+        )
+
+        job.result()  # aguarda finalizar
+
+    def table_metadata(self, table_id: str) -> dict:
+        # get_table lê só o recurso da tabela: não executa query nem é cobrado
+        tabela = self.client.get_table(table_id)
+        return {"num_rows": tabela.num_rows, "modified": tabela.modified}
+
+    def table_exists(self, table_id: str) -> bool:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            self.client.get_table(table_id)
+        except NotFound:
+            return False
+        return True
+
+    def table_columns(self, table_id: str) -> list[str]:
+        return [campo.name for campo in self.client.get_table(table_id).schema]
+
+    def replace_df(self, df: pd.DataFrame, table_id: str) -> None:
+        from google.cloud import bigquery
+
+        job_config = bigquery.LoadJobConfig(
+            write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE
+        )
+        self.client.load_table_from_dataframe(df, table_id, job_config=job_config).result()
+
+    def merge_sum(self, df: pd.DataFrame, table_id: str, chaves: list[str], soma: list[str]) -> None:
+        # carrega o delta numa tabela de staging e aplica com um único MERGE
+        staging_id = f"{table_id}_STAGING_{uuid.uuid4().hex[:8]}"
+        self.replace_df(df, staging_id)
+
+        try:
+            colunas = list(df.columns)
+            on = " AND ".join(f"T.{c} = S.{c}" for c in chaves)
+            updates = ", ".join(
+                f"{c} = COALESCE(T.{c}, 0) + COALESCE(S.{c}, 0)" if c in soma else f"{c} = S.{c}"
+                for c in colunas if c not in chaves
+            )
+
+            self.client.query(f"CREATE TABLE IF NOT EXISTS {table_id} AS SELECT * FROM {staging_id} WHERE FALSE").result()
+            self.client.query(f"""
+                MERGE {table_id} T
+                USING {staging_id} S
+                ON {on}
+                WHEN MATCHED THEN UPDATE SET {updates}
+                WHEN NOT MATCHED THEN INSERT ({", ".join(colunas)}) VALUES ({", ".join(f"S.{c}" for c in colunas)})
+            """).result()
+        finally:
+            self.client.delete_table(staging_id, not_found_ok=True)
+
+
+class SQLiteBackend(DataBackend):
+    """Backend local: um arquivo SQLite por dataset (ex.: data/SBOX_ISRAEL.sqlite).
+
+    Os arquivos são anexados com o nome do dataset, então as mesmas queries
+    `SELECT * FROM SBOX_ISRAEL.RECEITAS` funcionam sem alteração.
+    """
+
+    name = "sqlite"
+
+    COLUNAS_DATA = ("DATA", "CREATED_AT")
+
+    def __init__(self, db_dir: str):
+        self.db_dir = db_dir
+        os.makedirs(db_dir, exist_ok=True)
+
+    def _dataset_path(self, dataset: str) -> str:
+        return os.path.join(self.db_dir, f"{dataset}.sqlite")
+
+    def _connect(self) -> sqlite3.Connection:
+        # conexão por chamada: barata no SQLite e segura entre threads do Streamlit
+        conn = sqlite3.connect(":memory:")
+        for arquivo in sorted(os.listdir(self.db_dir)):
+            if arquivo.endswith(".sqlite"):
+                dataset = arquivo.removesuffix(".sqlite")
+                conn.execute("ATTACH DATABASE ? AS " + dataset, (os.path.join(self.db_dir, arquivo),))
+        return conn
+
+    @staticmethod
+    def _translate(sql: str) -> str:
+        # CAST(col AS DATE) (BigQuery) -> DATE(col), já que as datas são texto no SQLite
+        sql = re.sub(r"CAST\((\w+)\s+AS\s+DATE\)", r"DATE(\1)", sql, flags=re.IGNORECASE)
+        # parâmetros @nome (BigQuery) -> :nome (sqlite3)
+        return re.sub(r"@(\w+)", r":\1", sql)
+
+    def query(self, sql: str, params: dict | None = None, nome: str = "query") -> pd.DataFrame:
+        params = {
+            chave: valor.strftime("%Y-%m-%d") if isinstance(valor, pd.Timestamp) else valor
+            for chave, valor in (params or {}).items()
+        }
+
+        with timed(f"query:{nome}", backend=self.name):
+            conn = self._connect()
+            try:
+                df = pd.read_sql_query(self._translate(sql), conn, params=params)
+            finally:
+                conn.close()
+
+        for coluna in self.COLUNAS_DATA:
+            if coluna in df.columns:
+                df[coluna] = pd.to_datetime(df[coluna])
+
+        return df
+
+    @staticmethod
+    def _datas_como_texto(df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        # datas gravadas como texto YYYY-MM-DD, equivalente ao DATE do BigQuery
+        for coluna in df.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[coluna]):
+                df[coluna] = df[coluna].dt.strftime("%Y-%m-%d")
+        return df
+
+    def _write(self, df: pd.DataFrame, table_id: str, if_exists: str) -> None:
+        dataset, tabela = table_id.split(".")
+
+        conn = sqlite3.connect(self._dataset_path(dataset))
+        try:
+            self._datas_como_texto(df).to_sql(tabela, conn, if_exists=if_exists, index=False)
+        finally:
+            conn.close()
+
+    def append_df(self, df: pd.DataFrame, table_id: str) -> None:
+        self._add_missing_columns(df, table_id)
+        self._write(df, table_id, "append")
+
+    def _add_missing_columns(self, df: pd.DataFrame, table_id: str) -> None:
+        # mesmo comportamento do ALLOW_FIELD_ADDITION do BigQuery
+        if not self.table_exists(table_id):
+            return
+
+        existentes = set(self.table_columns(table_id))
+        dataset, tabela = table_id.split(".")
+        conn = sqlite3.connect(self._dataset_path(dataset))
+        try:
+            for coluna in df.columns:
+                if coluna not in existentes:
+                    conn.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna}")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def table_columns(self, table_id: str) -> list[str]:
+        dataset, tabela = table_id.split(".")
+        conn = sqlite3.connect(self._dataset_path(dataset))
+        try:
+            return [linha[1] for linha in conn.execute(f"PRAGMA table_info({tabela})")]
+        finally:
+            conn.close()
+
+    def replace_df(self, df: pd.DataFrame, table_id: str) -> None:
+        self._write(df, table_id, "replace")
+
+    def table_exists(self, table_id: str) -> bool:
+        dataset, tabela = table_id.split(".")
+        if not os.path.exists(self._dataset_path(dataset)):
+            return False
+
+        conn = sqlite3.connect(self._dataset_path(dataset))
+        try:
+            linha = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,)).fetchone()
+        finally:
+            conn.close()
+        return linha is not None
+
+    @staticmethod
+    def _linhas(df: pd.DataFrame) -> list[tuple]:
+        # sqlite3 não aceita escalares do numpy: converte para tipos Python (NaN -> NULL)
+        return [
+            tuple(None if pd.isna(v) else (v.item() if hasattr(v, "item") else v) for v in linha)
+            for linha in df.itertuples(index=False, name=None)
+        ]
+
+    def merge_sum(self, df: pd.DataFrame, table_id: str, chaves: list[str], soma: list[str]) -> None:
+        dataset, tabela = table_id.split(".")
+        df = self._datas_como_texto(df)
+        colunas = list(df.columns)
+
+        updates = ", ".join(
+            f"{c} = COALESCE({c}, 0) + COALESCE(excluded.{c}, 0)" if c in soma else f"{c} = excluded.{c}"
+            for c in colunas if c not in chaves
+        )
+
+        conn = sqlite3.connect(self._dataset_path(dataset))
+        try:
+            with conn:
+                if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,)).fetchone():
+                    df.head(0).to_sql(tabela, conn, index=False)
+                indice = [linha[2] for linha in conn.execute(f"PRAGMA index_info({tabela}_CHAVE)")]
+                if indice and indice != chaves:
+                    # chave mudou (ex.: BUCKET -> BUCKET, ROTA): o índice antigo recusaria o upsert
+                    conn.execute(f"DROP INDEX {tabela}_CHAVE")
+                conn.execute(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS {tabela}_CHAVE ON {tabela} ({', '.join(chaves)})"
+                )
+                conn.executemany(
+                    f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))}) "
+                    f"ON CONFLICT ({', '.join(chaves)}) DO UPDATE SET {updates}",
+                    self._linhas(df),
+                )
+        finally:
+            conn.close()
+
+    def table_metadata(self, table_id: str) -> dict:
+        conn = self._connect()
+        try:
+            num_rows, modified = conn.execute(
+                f"SELECT COUNT(*), MAX(CREATED_AT) FROM {table_id}"
+            ).fetchone()
+        finally:
+            conn.close()
+        # o SQLite não guarda a hora de alteração por tabela: a do arquivo do dataset
+        # pega reescritas com o mesmo número de linhas (ex.: rollups --rebuild)
+        arquivo = os.stat(self._dataset_path(table_id.split(".")[0])).st_mtime_ns
+        return {"num_rows": num_rows, "modified": modified, "arquivo": arquivo}
@@ -1,11 +1,50 @@
 import os
 import json
 import tempfile
-from google.cloud import bigquery
 from dotenv import load_dotenv
 import streamlit as st
 
+# Diretório padrão dos arquivos do backend local (relativo ao diretório de execução)
+LOCAL_DB_DIR_PADRAO = "data"
+
+# .env lido uma vez, na importação: get_setting roda várias vezes por rerun
+load_dotenv()
+
+
+def get_setting(nome: str, padrao: str | None = None) -> str | None:
+    # Streamlit Secrets primeiro (produção), depois variáveis de ambiente/.env
+    try:
+        if hasattr(st, 'secrets') and nome in st.secrets:
+            return str(st.secrets[nome])
+    except FileNotFoundError:
+        pass
+
+    return os.getenv(nome, padrao)
+
+
+def get_data_backend():
+    """Retorna o backend configurado em DATA_BACKEND: "bigquery" (padrão) ou "sqlite".
+
+    O backend "sqlite" lê/grava arquivos em LOCAL_DB_DIR e não precisa de
+    credenciais nem de rede.
+    """
+    from database.backends import BigQueryBackend, SQLiteBackend
+
+    backend = (get_setting("DATA_BACKEND", "bigquery") or "bigquery").lower()
+
+    if backend in ("sqlite", "local"):
+        return SQLiteBackend(get_setting("LOCAL_DB_DIR", LOCAL_DB_DIR_PADRAO))
+
+    if backend != "bigquery":
+        raise ValueError(f"DATA_BACKEND inválido: {backend}")
+
+    max_bytes = get_setting("QUERY_MAX_BYTES", "")
+    return BigQueryBackend(get_bigquery_client(), maximum_bytes_billed=int(float(max_bytes)) if max_bytes else None)
+
+
 def get_bigquery_client():
+    from google.cloud import bigquery
+
     # Tenta carregar do Streamlit Secrets primeiro (produção)
     if hasattr(st, 'secrets') and 'PROJECT_ID' in st.secrets:
         project_id = st.secrets["PROJECT_ID"]
@@ -42,6 +81,8 @@ def get_bigquery_client():
     
 
 def access_db_for_test():
+    from google.cloud import bigquery
+
     load_dotenv()
 
     project_id = os.getenv("PROJECT_ID")
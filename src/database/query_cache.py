@@ -0,0 +1,227 @@
+"""Camada de execução das queries: cache de resultados e limite de custo.
+
+Toda leitura do BusinessData passa pelo QueryExecutor, que:
+
+- identifica a query pelo SQL normalizado + parâmetros (fingerprint);
+- devolve repetições do cache local (TTL e limite de memória, LRU);
+- opcionalmente faz um dry run e recusa queries acima do orçamento;
+- registra hit/miss de cada chamada no PerfRecorder.
+
+O cache é invalidado quando os metadados das tabelas (brutas e resumo)
+mudam (ver BusinessData.fingerprint), então repetir "Atualizar dados" sem gravação
+nova não volta ao BigQuery, e uma gravação nova nunca é servida velha.
+
+Configuração (Streamlit Secrets ou .env):
+
+- QUERY_CACHE_TTL_SECONDS: validade de um resultado (padrão 300; 0 desliga o cache)
+- QUERY_CACHE_MAX_MB: memória máxima dos resultados guardados (padrão 256)
+- QUERY_MAX_BYTES: orçamento de bytes por query; também vira maximum_bytes_billed
+- QUERY_DRY_RUN: "1" faz o dry run antes de cada query que não estiver no cache
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from monitoring.instrumentation import record_cache_lookup, timed
+
+
+logger = logging.getLogger("dashboard.query_cache")
+
+TTL_PADRAO = 300
+MAX_MB_PADRAO = 256
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A estimativa do dry run passou do orçamento configurado em QUERY_MAX_BYTES"""
+
+    def __init__(self, nome: str, bytes_estimados: int, orcamento: int):
+        self.nome = nome
+        self.bytes_estimados = bytes_estimados
+        self.orcamento = orcamento
+        super().__init__(
+            f"query {nome} processaria {bytes_estimados / 1024 ** 2:,.1f} MB, "
+            f"acima do limite de {orcamento / 1024 ** 2:,.1f} MB"
+        )
+
+
+def normalize_sql(sql: str) -> str:
+    """Espaços colapsados e sem ';' final: a mesma query escrita de outro jeito tem o mesmo fingerprint"""
+    return re.sub(r"\s+", " ", sql).strip().rstrip(";").strip()
+
+
+def query_fingerprint(sql: str, params: dict | None = None) -> str:
+    chave = json.dumps([normalize_sql(sql), sorted((params or {}).items())], default=str, ensure_ascii=False)
+    return hashlib.sha256(chave.encode("utf-8")).hexdigest()
+
+
+class QueryResultCache:
+    """LRU de DataFrames com validade (TTL) e limite de memória total"""
+
+    def __init__(self, ttl: float = TTL_PADRAO, max_bytes: int = MAX_MB_PADRAO * 1024 ** 2):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._itens = OrderedDict()  # fingerprint -> (df, expira_em, bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def get(self, chave: str) -> pd.DataFrame | None:
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            if item[1] < time.monotonic():
+                self._remover(chave)
+                return None
+            self._itens.move_to_end(chave)
+            return item[0]
+
+    def put(self, chave: str, df: pd.DataFrame) -> None:
+        if self.ttl <= 0:
+            return
+        tamanho = int(df.memory_usage(deep=True).sum())
+        if tamanho > self.max_bytes:
+            # maior que o cache inteiro: não vale expulsar todo o resto
+            return
+
+        with self._lock:
+            if chave in self._itens:
+                self._remover(chave)
+            self._itens[chave] = (df, time.monotonic() + self.ttl, tamanho)
+            self._bytes += tamanho
+            self._expulsar()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+    def _remover(self, chave: str) -> None:
+        _, _, tamanho = self._itens.pop(chave)
+        self._bytes -= tamanho
+
+    def _expulsar(self) -> None:
+        agora = time.monotonic()
+        for chave in [chave for chave, (_, expira_em, _) in self._itens.items() if expira_em < agora]:
+            self._remover(chave)
+        while self._bytes > self.max_bytes and self._itens:
+            self._remover(next(iter(self._itens)))
+
+
+class QueryExecutor:
+    """Executa queries no backend passando pelo cache e pelo orçamento de bytes.
+
+    Os demais métodos do backend (table_exists, table_metadata...) são
+    repassados sem alteração, então o executor pode ser usado no lugar dele.
+    """
+
+    def __init__(self, backend, cache: QueryResultCache | None = None,
+                 max_bytes: int | None = None, dry_run: bool = False):
+        self.backend = backend
+        self.cache = cache if cache is not None else QueryResultCache()
+        self.max_bytes = max_bytes
+        self.dry_run = dry_run
+        self.hits = 0
+        self.misses = 0
+        self._fingerprint_tabelas = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, nome):
+        return getattr(self.backend, nome)
+
+    def query(self, sql: str, params: dict | None = None, nome: str = "query") -> pd.DataFrame:
+        inicio = time.perf_counter()
+        chave = query_fingerprint(sql, params)
+
+        df = self.cache.get(chave)
+        with self._lock:
+            if df is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        record_cache_lookup(nome, df is not None, (time.perf_counter() - inicio) * 1000)
+
+        if df is None:
+            self._check_budget(sql, params, nome)
+            df = self.backend.query(sql, params, nome=nome)
+            self.cache.put(chave, df)
+
+        # quem chamou pode alterar o frame (ex.: converter DATA); o guardado fica intacto
+        return df.copy()
+
+    def _check_budget(self, sql: str, params: dict | None, nome: str) -> None:
+        if not self.dry_run or not self.max_bytes:
+            return
+
+        with timed(f"dry_run:{nome}"):
+            estimativa = self.backend.estimate_bytes(sql, params)
+
+        if estimativa is not None and estimativa > self.max_bytes:
+            raise QueryBudgetExceeded(nome, estimativa, self.max_bytes)
+
+    def observe_fingerprint(self, fingerprint: dict) -> None:
+        """Limpa o cache quando os metadados das tabelas mudaram desde a última observação"""
+        with self._lock:
+            mudou = self._fingerprint_tabelas is not None and self._fingerprint_tabelas != fingerprint
+            self._fingerprint_tabelas = fingerprint
+        if mudou:
+            logger.info("tabelas alteradas; cache de queries limpo")
+            self.cache.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "resultados": len(self.cache),
+            "mb": round(self.cache.bytes / 1024 ** 2, 1),
+        }
+
+
+def settings() -> dict:
+    """Configuração do cache/orçamento lida de get_setting"""
+    from database.db_connection import get_setting
+
+    max_bytes = get_setting("QUERY_MAX_BYTES", "")
+    return {
+        "ttl": float(get_setting("QUERY_CACHE_TTL_SECONDS", str(TTL_PADRAO))),
+        "max_mb": float(get_setting("QUERY_CACHE_MAX_MB", str(MAX_MB_PADRAO))),
+        "max_bytes": int(float(max_bytes)) if max_bytes else None,
+        "dry_run": (get_setting("QUERY_DRY_RUN", "0") or "0").lower() in ("1", "true", "sim"),
+    }
+
+
+def build_executor(backend) -> QueryExecutor:
+    config = settings()
+    return QueryExecutor(
+        backend,
+        QueryResultCache(config["ttl"], int(config["max_mb"] * 1024 ** 2)),
+        max_bytes=config["max_bytes"],
+        dry_run=config["dry_run"],
+    )
+
+
+_executores: dict[tuple, QueryExecutor] = {}
+_executores_lock = threading.Lock()
+
+
+def get_query_executor() -> QueryExecutor:
+    """Executor do processo para o backend configurado (um por DATA_BACKEND/LOCAL_DB_DIR)"""
+    from database.db_connection import LOCAL_DB_DIR_PADRAO, get_data_backend, get_setting
+
+    chave = (get_setting("DATA_BACKEND", "bigquery"), get_setting("LOCAL_DB_DIR", LOCAL_DB_DIR_PADRAO))
+    with _executores_lock:
+        if chave not in _executores:
+            _executores[chave] = build_executor(get_data_backend())
+        return _executores[chave]
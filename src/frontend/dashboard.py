@@ -3,35 +3,70 @@ import os
 root_path = os.path.abspath("..")
 sys.path.append(root_path)
 
-from queries.get_data import BusinessData
+from monitoring.instrumentation import debug_enabled, get_recorder, timed
+from utils.lazy import lazy_import
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
+
+# pandas, plotly e os helpers de gráfico só carregam no primeiro uso, então o
+# título e os filtros aparecem antes (ver benchmarks/bench_startup.py)
+pd = lazy_import("pandas")
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
+time_buckets = lazy_import("frontend.time_buckets")
+metrics = lazy_import("frontend.metrics")
+
+TODAS_AS_ROTAS = "Todas as rotas"
 
 
 class VizReceitas:
+    # seções do corpo do dashboard, na ordem (também usadas pelos snapshots estáticos)
+    SECOES = (
+        "show_kpis",
+        "show_receitas_evolution",
+        "show_despesas_evolution",
+        "show_despesas_breakdown",
+        "show_weekday_analysis",
+        "show_faturamento_analysis",
+        "show_notas_analysis",
+        "show_cep_analysis",
+    )
+
     def __init__(self):
-        self.reload_data()
+        self.store = None
+        self.snapshot = None
+        # default period
+        self.periodo = "Todo período"
+        # None: frota inteira
+        self.rota = None
+        # dados só são carregados em render()/reload_data(), atrás do data store
 
 
     def reload_data(self):
-        business_data = BusinessData()
-        self.dados_receitas = business_data.get_receitas()
-        self.dados_despesas = business_data.get_despesas()
-        self.dados_peso = business_data.get_peso_notas()
-        # garantir tipos
-        self.dados_receitas['DATA'] = pd.to_datetime(self.dados_receitas['DATA'])
-        if 'DATA' in self.dados_despesas.columns:
-            self.dados_despesas['DATA'] = pd.to_datetime(self.dados_despesas['DATA'])
-        self.dados_peso['DATA'] = pd.to_datetime(self.dados_peso['DATA'])
-
-        self.last_update = datetime.now() - timedelta(hours=3)
-        # default period
-        self.periodo = "Todo período"
+        # camada de dados importada aqui para não pesar na inicialização
+        from queries.data_store import get_data_store
+        from queries.refresher import start_refresher
+        from api.metrics_api import start_metrics_api
+
+        self.store = get_data_store()
+        # a sessão guarda só a referência para a versão compartilhada dos dados
+        self.snapshot = self.store.get()
+        self.last_update = self.snapshot.loaded_at
+        start_refresher(self.store)
+        start_metrics_api(self.store)
         # filtered frames will be criados quando apply_period_filter for chamado
 
+    @property
+    def dados_receitas(self):
+        return self.snapshot.receitas
+
+    @property
+    def dados_despesas(self):
+        return self.snapshot.despesas
+
+    @property
+    def dados_peso(self):
+        return self.snapshot.peso_notas
+
     def set_title(self):
         st.set_page_config(page_title="Dashboard Financeiro", layout="wide", initial_sidebar_state="expanded")
         
@@ -59,37 +94,30 @@ class VizReceitas:
         st.markdown("---")
 
 
+    def select_rota(self):
+        """Seletor de rota/motorista (só aparece com mais de uma rota nos dados)"""
+        rotas = self.snapshot.rotas()
+        if len(rotas) <= 1:
+            self.rota = None
+            return
+
+        escolha = st.selectbox("Rota", [TODAS_AS_ROTAS, *rotas], key="global_rota")
+        self.rota = None if escolha == TODAS_AS_ROTAS else escolha
+        self.snapshot = self.snapshot.rota(self.rota)
+
     def apply_period_filter(self):
         """Aplica o filtro de período e popula atributos filtrados:
         self.df_rec_filtrado, self.df_desp_filtrado, self.df_peso_filtrado
         """
-        hoje = pd.Timestamp.now()
-        if self.periodo == "Últimos 7 dias":
-            data_inicio = hoje - timedelta(days=7)
-        elif self.periodo == 'Últimos 14 dias':
-            data_inicio = hoje - timedelta(days=14)
-        elif self.periodo == "Últimos 30 dias":
-            data_inicio = hoje - timedelta(days=30)
-        elif self.periodo == "Últimos 90 dias":
-            data_inicio = hoje - timedelta(days=90)
-        else:
-            data_inicio = self.dados_receitas['DATA'].min()
+        with timed("filtro_periodo", periodo=self.periodo, rota=self.rota):
+            self._apply_period_filter()
 
-        # Receitas
-        df_rec = self.dados_receitas.copy()
-        self.df_rec_filtrado = df_rec[df_rec['DATA'] >= data_inicio].copy() if not df_rec.empty else df_rec
+    def _apply_period_filter(self):
+        data_inicio = metrics.period_start(self.periodo, self.dados_receitas)
 
-        # Despesas
-        if hasattr(self, 'dados_despesas') and 'DATA' in self.dados_despesas.columns:
-            df_desp = self.dados_despesas.copy()
-            self.df_desp_filtrado = df_desp[df_desp['DATA'] >= data_inicio].copy()
-        else:
-            # fallback: keep original
-            self.df_desp_filtrado = self.dados_despesas.copy()
-
-        # Peso das notas
-        df_peso = self.dados_peso.copy()
-        self.df_peso_filtrado = df_peso[df_peso['DATA'] >= data_inicio].copy() if not df_peso.empty else df_peso
+        self.data_inicio = data_inicio
+        # recortes compartilhados entre as sessões (não alterar; show_* trabalham em cópias)
+        self.df_rec_filtrado, self.df_desp_filtrado, self.df_peso_filtrado = self.snapshot.since(data_inicio)
 
     def show_kpis(self):
         """Exibe KPIs principais"""
@@ -97,13 +125,13 @@ class VizReceitas:
         df_rec = getattr(self, 'df_rec_filtrado', self.dados_receitas).copy()
         df_desp = getattr(self, 'df_desp_filtrado', self.dados_despesas).copy()
         
-        # Calcular métricas
-        total_receitas = df_rec['VALOR_TOTAL'].sum()
-        total_despesas = df_desp['VALOR'].sum() if 'VALOR' in df_desp.columns else 0
-        lucro = total_receitas - total_despesas
-        margem = lucro / total_receitas * 100 if total_receitas > 0 else 0
-        total_notas = df_rec['NOTAS_REALIZADAS'].sum() if 'NOTAS_REALIZADAS' in df_rec.columns else 0
-        ticket_medio = total_receitas / total_notas if total_notas > 0 else 0
+        # Calcular métricas (mesmo cálculo servido pela API de métricas)
+        kpis = metrics.compute_kpis(df_rec, df_desp)
+        total_receitas = kpis['receita_total']
+        total_despesas = kpis['despesas']
+        lucro = kpis['lucro']
+        margem = kpis['margem']
+        ticket_medio = kpis['ticket_medio']
         
         # Exibir KPIs
         st.markdown("### 📈 Indicadores Principais")
@@ -154,34 +182,43 @@ class VizReceitas:
         df['DATA'] = pd.to_datetime(df['DATA'])
         df = df.sort_values('DATA')
 
+        # agrupar por dia/semana/mês conforme a janela e reduzir pontos (LTTB)
+        serie, bucket = time_buckets.prepare_evolution_series(df, 'VALOR_TOTAL')
+        granularidade = time_buckets.GRANULARIDADES[bucket]
+        mostrar_rotulos = len(serie) <= time_buckets.MAX_ROTULOS
+
         # cálculo de padding no eixo X para evitar corte do último ponto
-        min_dt = df['DATA'].min()
-        max_dt = df['DATA'].max()
-        pad = pd.Timedelta(days=1)  # ajuste se precisar de mais/menos espaço
+        min_dt = serie['DATA'].min()
+        max_dt = serie['DATA'].max()
+        pad = granularidade['pad']  # ajuste se precisar de mais/menos espaço
         x_range = [min_dt - pad, max_dt + pad]
 
         col1, col2 = st.columns([8, 2])
 
         with col1:
             st.markdown("### 📈 Evolução das Receitas")
+            if bucket != "D":
+                st.caption(f"Visão {granularidade['nome'].lower()} (valores somados por período)")
 
             fig = go.Figure()
 
             fig.add_trace(go.Scatter(
-                x=df['DATA'],
-                y=df['VALOR_TOTAL'],
-                mode='lines+markers+text',
+                x=serie['DATA'],
+                y=serie['VALOR_TOTAL'],
+                mode='lines+markers+text' if mostrar_rotulos else 'lines',
                 name='Receita',
                 fill='tozeroy',
                 line=dict(color="#66ea73", width=3),
                 marker=dict(size=8, color="#14c72f"),
-                text=[f'R$ {val:,.2f}' for val in df['VALOR_TOTAL']],
+                text=[f'R$ {val:,.2f}' for val in serie['VALOR_TOTAL']] if mostrar_rotulos else None,
                 textposition='top center',
                 textfont=dict(size=10, color="#F2ECEC"),
-                hovertemplate='Data: %{x|%d/%m/%Y}<br>Receita: R$ %{y:,.2f}<extra></extra>',
+                hovertemplate=f"Data: %{{x|{granularidade['hover']}}}<br>Receita: R$ %{{y:,.2f}}<extra></extra>",
                 cliponaxis=False  # importante para não cortar os textos fora do plot
             ))
 
+            overlays = self._add_rolling_overlays(fig, 'RECEITA', bucket, margem=True)
+
             # forçar range com padding, formato de tick e margens maiores
             fig.update_xaxes(
                 tickformat='%d/%m/%Y',
@@ -197,7 +234,8 @@ class VizReceitas:
                 plot_bgcolor='rgba(0,0,0,0)',
                 paper_bgcolor='rgba(0,0,0,0)',
                 yaxis=dict(showgrid=True, gridcolor='rgba(128,128,128,0.2)', title='Valor (R$)'),
-                showlegend=False,
+                showlegend=overlays,
+                legend=dict(orientation='h', yanchor='bottom', y=1.02, x=0),
                 autosize=True,
                 margin=dict(l=60, r=80, t=40, b=60)  # r aumentado para evitar corte pelo painel de estatísticas
             )
@@ -214,7 +252,57 @@ class VizReceitas:
             st.metric("Média Diária", f"R$ {receita_media:,.2f}")
             st.metric("Maior Receita", f"R$ {receita_max:,.2f}")
             st.metric("Menor Receita", f"R$ {receita_min:,.2f}")
+            self._show_monthly_growth('RECEITA', "Receita")
+
+
+    def _add_rolling_overlays(self, fig, coluna: str, bucket: str, margem: bool = False) -> bool:
+        """Médias móveis de 7/30 dias (e margem acumulada) sobre o gráfico diário"""
+        if bucket != "D":
+            # na visão semanal/mensal os pontos são somas do período; médias diárias não se comparam
+            return False
+
+        medias = self.snapshot.rolling().series(self.data_inicio)
+        if medias.empty:
+            return False
+
+        for janela, estilo in ((7, 'dot'), (30, 'dash')):
+            fig.add_trace(go.Scatter(
+                x=medias['DATA'],
+                y=medias[f'MA{janela}_{coluna}'],
+                mode='lines',
+                name=f'Média {janela} dias',
+                line=dict(width=2, dash=estilo),
+                hovertemplate=f"Média {janela} dias: R$ %{{y:,.2f}}<extra></extra>",
+            ))
+
+        if margem:
+            fig.add_trace(go.Scatter(
+                x=medias['DATA'],
+                y=medias['MARGEM_ACUMULADA'],
+                mode='lines',
+                name='Margem acumulada (%)',
+                yaxis='y2',
+                line=dict(width=1.5, color='#b0b0b0'),
+                hovertemplate="Margem acumulada: %{y:.1f}%<extra></extra>",
+            ))
+            fig.update_layout(yaxis2=dict(overlaying='y', side='right', showgrid=False, ticksuffix='%', rangemode='tozero'))
+
+        return True
+
+    def _show_monthly_growth(self, coluna: str, rotulo: str):
+        """Total do último mês com dados e a variação sobre o mês anterior (mesmos dias, se o mês está em curso)"""
+        mes = self.snapshot.rolling().month_to_date()
+        if mes is None:
+            return
 
+        crescimento = mes[f'CRESC_{coluna}']
+        comparacao = f"dias 1-{mes['DIAS']} do mês anterior" if mes['PARCIAL'] else "mês anterior"
+        st.metric(
+            f"{rotulo} {mes['MES']:%m/%Y}" + (f" (até dia {mes['DIAS']})" if mes['PARCIAL'] else ""),
+            f"R$ {mes[coluna]:,.2f}",
+            delta=f"{crescimento:+.1f}% vs {comparacao}" if pd.notna(crescimento) else None,
+            delta_color="inverse" if coluna == 'DESPESAS' else "normal",
+        )
 
     def show_despesas_evolution(self):
         """Gráfico de evolução das receitas"""
@@ -226,34 +314,43 @@ class VizReceitas:
         df['DATA'] = pd.to_datetime(df['DATA'])
         df = df.sort_values('DATA')
 
+        # agrupar por dia/semana/mês conforme a janela e reduzir pontos (LTTB)
+        serie, bucket = time_buckets.prepare_evolution_series(df, 'VALOR')
+        granularidade = time_buckets.GRANULARIDADES[bucket]
+        mostrar_rotulos = len(serie) <= time_buckets.MAX_ROTULOS
+
         # cálculo de padding no eixo X para evitar corte do último ponto
-        min_dt = df['DATA'].min()
-        max_dt = df['DATA'].max()
-        pad = pd.Timedelta(days=1)  # ajuste se precisar de mais/menos espaço
+        min_dt = serie['DATA'].min()
+        max_dt = serie['DATA'].max()
+        pad = granularidade['pad']  # ajuste se precisar de mais/menos espaço
         x_range = [min_dt - pad, max_dt + pad]
 
         col1, col2 = st.columns([8, 2])
 
         with col1:
             st.markdown("### 📉 Evolução das Despesas")
+            if bucket != "D":
+                st.caption(f"Visão {granularidade['nome'].lower()} (valores somados por período)")
 
             fig = go.Figure()
 
             fig.add_trace(go.Scatter(
-                x=df['DATA'],
-                y=df['VALOR'],
-                mode='lines+markers+text',
+                x=serie['DATA'],
+                y=serie['VALOR'],
+                mode='lines+markers+text' if mostrar_rotulos else 'lines',
                 name='Despesa',
                 fill='tozeroy',
                 line=dict(color="#ea6a66", width=3),
                 marker=dict(size=8, color="#c72914"),
-                text=[f'R$ {val:,.2f}' for val in df['VALOR']],
+                text=[f'R$ {val:,.2f}' for val in serie['VALOR']] if mostrar_rotulos else None,
                 textposition='top center',
                 textfont=dict(size=10, color="#F2ECEC"),
-                hovertemplate='Data: %{x|%d/%m/%Y}<br>Despesa: R$ %{y:,.2f}<extra></extra>',
+                hovertemplate=f"Data: %{{x|{granularidade['hover']}}}<br>Despesa: R$ %{{y:,.2f}}<extra></extra>",
                 cliponaxis=False  # importante para não cortar os textos fora do plot
             ))
 
+            overlays = self._add_rolling_overlays(fig, 'DESPESAS', bucket)
+
             # forçar range com padding, formato de tick e margens maiores
             fig.update_xaxes(
                 tickformat='%d/%m/%Y',
@@ -269,7 +366,8 @@ class VizReceitas:
                 plot_bgcolor='rgba(0,0,0,0)',
                 paper_bgcolor='rgba(0,0,0,0)',
                 yaxis=dict(showgrid=True, gridcolor='rgba(128,128,128,0.2)', title='Valor (R$)'),
-                showlegend=False,
+                showlegend=overlays,
+                legend=dict(orientation='h', yanchor='bottom', y=1.02, x=0),
                 autosize=True,
                 margin=dict(l=60, r=80, t=40, b=60)  # r aumentado para evitar corte pelo painel de estatísticas
             )
@@ -286,6 +384,7 @@ class VizReceitas:
             st.metric("Média Diária", f"R$ {despesa_media:,.2f}")
             st.metric("Maior Despesa", f"R$ {despesa_max:,.2f}")
             st.metric("Menor Despesa", f"R$ {despesa_min:,.2f}")
+            self._show_monthly_growth('DESPESAS', "Despesa")
 
 
     def show_weekday_analysis(self):
@@ -641,12 +740,11 @@ class VizReceitas:
             
             col1, col2 = st.columns(2)
             
-            categoria_col = 'CATEGORIA' if 'CATEGORIA' in df.columns else 'TIPO'
+            categoria_col = metrics.categoria_column(df)
             
             with col1:
                 # Despesas por categoria
-                despesas_cat = df.groupby(categoria_col)['VALOR'].sum().reset_index()
-                despesas_cat = despesas_cat.sort_values('VALOR', ascending=False)
+                despesas_cat = metrics.despesas_por_categoria(df)
                 
                 fig = px.bar(
                     despesas_cat,
@@ -698,14 +796,81 @@ class VizReceitas:
                     </div>
                     """, unsafe_allow_html=True)
 
+    def show_cep_analysis(self):
+        """Receita por região de CEP e dias em que um CEP foi atendido"""
+        indice = self.snapshot.cep_index()
+        if len(indice) == 0:
+            return
+
+        st.markdown("### 📍 Receita por Região de CEP")
+
+        por_cep = indice.receita_por_cep(self.data_inicio)
+        if por_cep.empty:
+            st.caption("Nenhum romaneio com faixa de CEPs no período.")
+            return
+
+        col1, col2 = st.columns([7, 3])
+
+        with col1:
+            fig = go.Figure()
+
+            fig.add_trace(go.Bar(
+                x=por_cep['CEP_LABEL'],
+                y=por_cep['RECEITA_RATEADA'],
+                marker_color='#4caf50',
+                customdata=por_cep[['DIAS', 'RECEITA']],
+                hovertemplate='CEP %{x}<br>Receita rateada: R$ %{y:,.2f}'
+                              '<br>Dias atendidos: %{customdata[0]}'
+                              '<br>Receita dos dias: R$ %{customdata[1]:,.2f}<extra></extra>',
+            ))
+
+            fig.update_layout(
+                height=400,
+                showlegend=False,
+                plot_bgcolor='rgba(0,0,0,0)',
+                xaxis=dict(showgrid=False, title='CEP (3 dígitos)', type='category'),
+                yaxis=dict(showgrid=True, gridcolor='rgba(128,128,128,0.2)', title='Receita rateada (R$)'),
+                margin=dict(t=40, b=60, l=60, r=40)
+            )
+
+            st.plotly_chart(fig, use_container_width=True)
+
+        with col2:
+            st.markdown("#### 🔎 Buscar CEP")
+            cep = st.number_input("Prefixo do CEP", min_value=0, max_value=999, step=1,
+                                  value=int(por_cep.loc[por_cep['RECEITA_RATEADA'].idxmax(), 'CEP']), key="busca_cep")
+
+            dias = indice.rows_for_cep(int(cep), self.data_inicio)
+            st.metric("Dias atendidos", len(dias))
+            st.metric("Receita dos dias", f"R$ {dias['VALOR_TOTAL'].sum():,.2f}")
+
+            if not dias.empty:
+                tabela = dias.assign(
+                    DATA=dias['DATA'].dt.strftime('%Y-%m-%d'),
+                    FAIXA=dias['CEP_INICIO'].map('{:03d}'.format) + '-' + dias['CEP_FIM'].map('{:03d}'.format),
+                )[['DATA', 'FAIXA', 'VALOR_TOTAL']]
+                st.dataframe(tabela, hide_index=True, use_container_width=True, height=200)
+
     def show_data_table(self):
         """Exibe tabelas de dados"""
         st.markdown("### 📋 Dados Detalhados")
+
+        if self.snapshot.fonte == "resumo":
+            # os gráficos usam o resumo diário; as linhas brutas só são lidas sob demanda
+            if not st.toggle("Mostrar linhas dos romaneios", key="drill_down"):
+                st.caption("Os indicadores acima vêm das tabelas de resumo. Ative para carregar as linhas brutas.")
+                return
+            with st.spinner("Carregando linhas dos romaneios..."):
+                df_rec, df_desp, df_peso = self.snapshot.detalhado().since(self.data_inicio)
+        else:
+            df_rec = getattr(self, 'df_rec_filtrado', self.dados_receitas)
+            df_desp = getattr(self, 'df_desp_filtrado', self.dados_despesas)
+            df_peso = getattr(self, 'df_peso_filtrado', self.dados_peso)
         
         tab1, tab2, tab3 = st.tabs(["💰 Receitas", "💸 Despesas", "⚖️ Peso das Notas"])
         
         with tab1:
-            df_to_show_receitas = getattr(self, 'df_rec_filtrado', self.dados_receitas).copy()
+            df_to_show_receitas = df_rec.copy()
             df_to_show_receitas['DATA'] = pd.to_datetime(df_to_show_receitas['DATA']).dt.strftime('%Y-%m-%d')
             st.dataframe(
                 df_to_show_receitas.sort_values('DATA', ascending=False),
@@ -714,7 +879,7 @@ class VizReceitas:
             )
             
         with tab2:
-            df_to_show_despesas = getattr(self, 'df_desp_filtrado', self.dados_despesas).copy()
+            df_to_show_despesas = df_desp.copy()
             if 'DATA' in df_to_show_despesas.columns:
                 df_to_show_despesas['DATA'] = pd.to_datetime(df_to_show_despesas['DATA']).dt.strftime('%Y-%m-%d')
             st.dataframe(
@@ -724,7 +889,7 @@ class VizReceitas:
             )
             
         with tab3:
-            df_to_show_peso_notas = getattr(self, 'df_peso_filtrado', self.dados_peso).copy()
+            df_to_show_peso_notas = df_peso.copy()
             df_to_show_peso_notas['DATA'] = pd.to_datetime(df_to_show_peso_notas['DATA']).dt.strftime('%Y-%m-%d')
             st.dataframe(
                 df_to_show_peso_notas.sort_values('DATA', ascending=False),
@@ -732,6 +897,59 @@ class VizReceitas:
                 height=400
             )
 
+    def show_refresh_controls(self):
+        """Atualização em segundo plano: ninguém espera pelo banco nem perde o cache"""
+        if st.button("🔄 Atualizar dados"):
+            if self.store.refresh_async():
+                st.info("Atualizando em segundo plano — os dados novos aparecem na próxima interação.")
+        elif self.store.refreshing:
+            st.caption("🔄 Atualização em andamento...")
+
+        if self.store.last_error is not None:
+            st.warning(f"Não foi possível atualizar os dados: {self.store.last_error}")
+
+        # avisar a sessão quando ela passar a ver uma versão nova dos dados
+        versao_vista = st.session_state.get("versao_dados")
+        if versao_vista is not None and versao_vista != self.snapshot.version:
+            st.toast("Dados atualizados com sucesso!")
+        st.session_state["versao_dados"] = self.snapshot.version
+
+    def show_debug_panel(self):
+        """Painel lateral com os tempos da execução atual e p50/p95 do processo"""
+        recorder = get_recorder()
+
+        with st.sidebar:
+            st.markdown("### 🐞 Desempenho")
+
+            execucao = pd.DataFrame(recorder.current_run())
+            if not execucao.empty:
+                st.markdown("**Execução atual**")
+                st.dataframe(execucao[['secao', 'duracao_ms']], hide_index=True, use_container_width=True)
+
+            resumo = pd.DataFrame(recorder.summary())
+            if not resumo.empty:
+                st.markdown("**Histórico (p50/p95)**")
+                st.dataframe(resumo, hide_index=True, use_container_width=True)
+
+            st.markdown(
+                f"**Versão dos dados:** {self.snapshot.version} "
+                f"(em memória: {', '.join(map(str, self.store.live_versions()))})"
+            )
+
+            from database.query_cache import get_query_executor
+
+            cache = get_query_executor().stats()
+            st.markdown(
+                f"**Cache de queries:** {cache['hits']} hits / {cache['misses']} misses "
+                f"({cache['resultados']} resultados, {cache['mb']} MB)"
+            )
+
+            queries = pd.DataFrame(recorder.query_stats())
+            if not queries.empty:
+                st.markdown("**Queries BigQuery**")
+                colunas = ['secao', 'duracao_ms', 'bytes_processados', 'slot_ms', 'cache_hit']
+                st.dataframe(queries[colunas].tail(10), hide_index=True, use_container_width=True)
+
     def render(self):
         """Renderiza todo o dashboard"""
         self.set_title()
@@ -741,31 +959,30 @@ class VizReceitas:
         with col1:
             self.periodo = st.selectbox("Período", ["Últimos 7 dias", "Últimos 14 dias","Últimos 30 dias", "Últimos 90 dias", "Todo período"], key="global_periodo")
 
+        # carga fica depois do título/filtros; só espera pelo banco a primeira sessão do processo
+        with st.spinner("Carregando dados do banco..."):
+            self.reload_data()
+
+        # rota selecionada: daqui em diante todas as seções usam só a partição dela
+        with col2:
+            self.select_rota()
+
         # aplicar filtro global
         self.apply_period_filter()
 
-        if st.button("🔄 Atualizar dados"):
-            st.cache_data.clear()
-            st.cache_resource.clear()
-            with st.spinner("Carregando dados do banco..."):
-                self.reload_data()
-                # reaplicar filtro após recarregar dados
-                self.apply_period_filter()
-            st.success("Dados atualizados com sucesso!")
-            st.rerun()
-
-        self.show_kpis()
-        
-        self.show_receitas_evolution()
-        self.show_despesas_evolution()
-        self.show_despesas_breakdown()
-        self.show_weekday_analysis()
-        self.show_faturamento_analysis()
-        self.show_notas_analysis()
+        self.show_refresh_controls()
+
+        for secao in self.SECOES:
+            with timed(secao, periodo=self.periodo, rota=self.rota):
+                getattr(self, secao)()
      
         st.markdown("---")
-        self.show_data_table()
+        with timed("show_data_table", periodo=self.periodo):
+            self.show_data_table()
         st.markdown(
     f"🕒 **Última atualização:** {self.last_update.strftime('%d/%m/%Y %H:%M:%S')}")
 
+        if debug_enabled(st.query_params):
+            self.show_debug_panel()
+
 
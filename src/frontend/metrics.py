@@ -0,0 +1,92 @@
+"""Métricas do dashboard sem dependência do Streamlit.
+
+Usadas pelo VizReceitas e pela API de métricas (api/metrics_api.py), para
+que os dois mostrem exatamente os mesmos números.
+"""
+from datetime import timedelta
+
+import pandas as pd
+
+
+# rótulo do seletor -> janela em dias (None: todo o histórico)
+PERIODOS = {
+    "Últimos 7 dias": 7,
+    "Últimos 14 dias": 14,
+    "Últimos 30 dias": 30,
+    "Últimos 90 dias": 90,
+    "Todo período": None,
+}
+PERIODO_PADRAO = "Todo período"
+
+
+def period_slug(periodo: str) -> str:
+    """Forma curta usada na URL da API: "7d", "30d", "todo" """
+    dias = PERIODOS[periodo]
+    return f"{dias}d" if dias else "todo"
+
+
+def parse_periodo(valor: str | None) -> str:
+    """Rótulo do período a partir do rótulo ou da forma curta; ValueError se desconhecido"""
+    if not valor:
+        return PERIODO_PADRAO
+    if valor in PERIODOS:
+        return valor
+    for periodo in PERIODOS:
+        if period_slug(periodo) == valor.lower():
+            return periodo
+    raise ValueError(f"período desconhecido: {valor}")
+
+
+def period_start(periodo: str, receitas: pd.DataFrame):
+    """Data inicial do período (o dia mais antigo das receitas para "Todo período")"""
+    dias = PERIODOS.get(periodo)
+    if dias is None:
+        return receitas['DATA'].min()
+    return pd.Timestamp.now() - timedelta(days=dias)
+
+
+def compute_kpis(df_rec: pd.DataFrame, df_desp: pd.DataFrame) -> dict:
+    """Indicadores principais (mesmo cálculo do bloco de KPIs do dashboard)"""
+    total_receitas = float(df_rec['VALOR_TOTAL'].sum())
+    total_despesas = float(df_desp['VALOR'].sum()) if 'VALOR' in df_desp.columns else 0.0
+    lucro = total_receitas - total_despesas
+    margem = lucro / total_receitas * 100 if total_receitas > 0 else 0.0
+    total_notas = float(df_rec['NOTAS_REALIZADAS'].sum()) if 'NOTAS_REALIZADAS' in df_rec.columns else 0.0
+    ticket_medio = total_receitas / total_notas if total_notas > 0 else 0.0
+
+    return {
+        "receita_total": total_receitas,
+        "despesas": total_despesas,
+        "lucro": lucro,
+        "ticket_medio": ticket_medio,
+        "margem": margem,
+        "notas_realizadas": total_notas,
+    }
+
+
+def daily_series(df_rec: pd.DataFrame, df_desp: pd.DataFrame) -> pd.DataFrame:
+    """Receita, despesas e lucro por dia (DATA, RECEITA, DESPESAS, LUCRO)"""
+    receita = df_rec.groupby('DATA')['VALOR_TOTAL'].sum().rename('RECEITA')
+    despesas = df_desp.groupby('DATA')['VALOR'].sum().rename('DESPESAS')
+
+    serie = pd.concat([receita, despesas], axis=1).fillna(0.0).sort_index()
+    serie['LUCRO'] = serie['RECEITA'] - serie['DESPESAS']
+    return serie.rename_axis('DATA').reset_index()
+
+
+def categoria_column(df_desp: pd.DataFrame) -> str | None:
+    if 'CATEGORIA' in df_desp.columns:
+        return 'CATEGORIA'
+    if 'TIPO' in df_desp.columns:
+        return 'TIPO'
+    return None
+
+
+def despesas_por_categoria(df_desp: pd.DataFrame) -> pd.DataFrame:
+    """Total de despesas por categoria, do maior para o menor"""
+    coluna = categoria_column(df_desp)
+    if coluna is None:
+        return pd.DataFrame(columns=['CATEGORIA', 'VALOR'])
+
+    despesas_cat = df_desp.groupby(coluna)['VALOR'].sum().reset_index()
+    return despesas_cat.sort_values('VALOR', ascending=False, ignore_index=True)
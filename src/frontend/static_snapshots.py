@@ -0,0 +1,329 @@
+"""Snapshots estáticos do dashboard (HTML + JSON) para quem só visualiza.
+
+Renderiza os KPIs e todas as seções do VizReceitas para cada período do
+seletor e grava um arquivo por período, mais um manifest.json com a versão
+dos dados. Qualquer servidor de arquivos estáticos serve o resultado, sem
+pandas nem Plotly por visitante; a sessão Streamlit fica para a exploração
+interativa.
+
+A partir de src/:
+
+    python -m frontend.static_snapshots --once          # gera e sai
+    python -m frontend.static_snapshots                 # regera a cada versão nova ou virada de dia
+
+O destino é SNAPSHOT_DIR (padrão static_snapshots/). Roda num processo
+próprio: o gerador troca o `st` do módulo do dashboard por um gravador.
+"""
+import argparse
+import html
+import json
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from database.db_connection import get_setting
+from frontend import dashboard, metrics
+from monitoring.instrumentation import timed
+from queries.data_store import SharedDataStore, get_data_store
+
+
+logger = logging.getLogger("dashboard.snapshots")
+
+PLOTLY_CDN = "https://cdn.plot.ly/plotly-2.35.2.min.js"
+
+# intervalo (s) entre as verificações de versão nova no modo contínuo
+INTERVALO_PADRAO = 30
+
+
+class _Bloco:
+    """Colunas, abas, spinner...: só o `with`, o conteúdo sai na ordem das chamadas"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __getattr__(self, nome):
+        return self
+
+
+class RecordingStreamlit:
+    """Imita a API do Streamlit usada pelo VizReceitas e grava o que seria exibido.
+
+    Widgets devolvem o valor padrão (a visão estática é a que um visitante
+    vê ao abrir a página), e os elementos ficam em `elementos`, na ordem.
+    """
+
+    def __init__(self):
+        self.elementos: list[dict] = []
+        self.query_params = {}
+        self.session_state = {}
+        self.sidebar = _Bloco()
+
+    def __getattr__(self, nome):
+        # chamadas sem saída visual (set_page_config, toast, spinner...)
+        return _Bloco()
+
+    def _texto(self, tipo, texto, **kwargs):
+        self.elementos.append({"tipo": tipo, "texto": str(texto)})
+
+    def markdown(self, texto, **kwargs):
+        self._texto("markdown", texto)
+
+    def caption(self, texto, **kwargs):
+        self._texto("caption", texto)
+
+    def info(self, texto, **kwargs):
+        self._texto("info", texto)
+
+    def warning(self, texto, **kwargs):
+        self._texto("warning", texto)
+
+    def metric(self, label, value, **kwargs):
+        self.elementos.append({"tipo": "metric", "label": str(label), "value": str(value)})
+
+    def plotly_chart(self, fig, **kwargs):
+        self.elementos.append({"tipo": "plotly", "figura": fig})
+
+    def dataframe(self, df, **kwargs):
+        self.elementos.append({"tipo": "dataframe", "df": df})
+
+    def columns(self, spec, **kwargs):
+        n = spec if isinstance(spec, int) else len(spec)
+        return [_Bloco() for _ in range(n)]
+
+    def tabs(self, nomes):
+        return [_Bloco() for _ in nomes]
+
+    def selectbox(self, label, options, index=0, **kwargs):
+        return options[index]
+
+    def number_input(self, label, value=None, **kwargs):
+        return value if value is not None else kwargs.get("min_value", 0)
+
+    def toggle(self, *args, value=False, **kwargs):
+        return value
+
+    def button(self, *args, **kwargs):
+        return False
+
+
+@contextmanager
+def _gravando(gravador: RecordingStreamlit):
+    original = dashboard.st
+    dashboard.st = gravador
+    try:
+        yield gravador
+    finally:
+        dashboard.st = original
+
+
+def render_period(viz: "dashboard.VizReceitas", periodo: str) -> list[dict]:
+    """Elementos das seções do dashboard para um período"""
+    with _gravando(RecordingStreamlit()) as gravador:
+        viz.periodo = periodo
+        viz.apply_period_filter()
+        for secao in viz.SECOES:
+            with timed(f"snapshot:{secao}", periodo=periodo):
+                getattr(viz, secao)()
+    return gravador.elementos
+
+
+# ---- saída ---------------------------------------------------------------
+
+def _markdown_html(texto: str) -> str:
+    texto = texto.strip()
+    if texto == "---":
+        return "<hr>"
+    if texto.startswith("<"):
+        # blocos com unsafe_allow_html já vêm em HTML
+        return texto
+
+    titulo = re.match(r"(#{1,6})\s+(.*)", texto)
+    corpo = html.escape(titulo.group(2) if titulo else texto)
+    corpo = re.sub(r"\*\*(.+?)\*\*", r"<b>\1</b>", corpo)
+    if titulo:
+        nivel = len(titulo.group(1))
+        return f"<h{nivel}>{corpo}</h{nivel}>"
+    return f"<p>{corpo}</p>"
+
+
+def _elemento_html(elemento: dict) -> str:
+    tipo = elemento["tipo"]
+    if tipo == "markdown":
+        return _markdown_html(elemento["texto"])
+    if tipo == "metric":
+        return (f'<div class="metric"><span>{html.escape(elemento["label"])}</span>'
+                f'<strong>{html.escape(elemento["value"])}</strong></div>')
+    if tipo == "plotly":
+        return elemento["figura"].to_html(full_html=False, include_plotlyjs=False)
+    if tipo == "dataframe":
+        return elemento["df"].to_html(index=False, classes="tabela", float_format=lambda v: f"{v:,.2f}")
+    return f'<p class="{tipo}">{html.escape(elemento["texto"])}</p>'
+
+
+def to_html(elementos: list[dict], periodo: str, snapshot) -> str:
+    links = " · ".join(
+        f'<a href="{metrics.period_slug(p)}.html">{html.escape(p)}</a>' if p != periodo else f"<b>{html.escape(p)}</b>"
+        for p in metrics.PERIODOS
+    )
+    corpo = "\n".join(_elemento_html(elemento) for elemento in elementos)
+    atualizado = snapshot.loaded_at.strftime("%d/%m/%Y %H:%M:%S")
+
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Dashboard Financeiro — {html.escape(periodo)}</title>
+<script src="{PLOTLY_CDN}"></script>
+<style>
+body {{ font-family: sans-serif; max-width: 1400px; margin: 0 auto; padding: 1rem; background: #0e1117; color: #fafafa; }}
+a {{ color: #66ea73; }}
+.metric {{ display: inline-block; margin: 0 2rem 1rem 0; }}
+.metric span {{ display: block; font-size: 0.9rem; opacity: 0.8; }}
+.metric strong {{ font-size: 1.8rem; }}
+.caption {{ font-size: 0.85rem; opacity: 0.7; }}
+.tabela {{ border-collapse: collapse; font-size: 0.85rem; }}
+.tabela td, .tabela th {{ padding: 0.2rem 0.6rem; border-bottom: 1px solid #333; }}
+</style>
+</head>
+<body>
+<h1>📊 Dashboard Financeiro</h1>
+<p>{links}</p>
+{corpo}
+<hr>
+<p>🕒 <b>Última atualização:</b> {atualizado} · versão {snapshot.version}</p>
+</body>
+</html>
+"""
+
+
+def to_json(elementos: list[dict], periodo: str, snapshot) -> dict:
+    convertidos = []
+    for elemento in elementos:
+        if elemento["tipo"] == "plotly":
+            elemento = {"tipo": "plotly", "figura": json.loads(elemento["figura"].to_json())}
+        elif elemento["tipo"] == "dataframe":
+            elemento = {"tipo": "dataframe", "linhas": json.loads(elemento["df"].to_json(orient="records", force_ascii=False))}
+        convertidos.append(elemento)
+
+    return {
+        "versao": snapshot.version,
+        "periodo": metrics.period_slug(periodo),
+        "atualizado_em": snapshot.loaded_at.isoformat(timespec="seconds"),
+        "elementos": convertidos,
+    }
+
+
+def _gravar(caminho: str, conteudo: str) -> None:
+    # grava ao lado e troca de uma vez: quem estiver servindo nunca lê arquivo pela metade
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        arquivo.write(conteudo)
+    os.replace(temporario, caminho)
+
+
+def generate_snapshots(store: SharedDataStore, destino: str, periodos=None) -> dict:
+    """Gera HTML e JSON de cada período para a versão atual; retorna o manifest"""
+    periodos = list(periodos or metrics.PERIODOS)
+    os.makedirs(destino, exist_ok=True)
+
+    viz = dashboard.VizReceitas()
+    viz.store = store
+    viz.snapshot = store.get()
+    viz.last_update = viz.snapshot.loaded_at
+
+    arquivos = {}
+    with timed("snapshots_estaticos", versao=viz.snapshot.version):
+        for periodo in periodos:
+            elementos = render_period(viz, periodo)
+            slug = metrics.period_slug(periodo)
+            _gravar(os.path.join(destino, f"{slug}.html"), to_html(elementos, periodo, viz.snapshot))
+            _gravar(os.path.join(destino, f"{slug}.json"),
+                    json.dumps(to_json(elementos, periodo, viz.snapshot), ensure_ascii=False, default=str))
+            arquivos[slug] = {"periodo": periodo, "html": f"{slug}.html", "json": f"{slug}.json"}
+
+    padrao = metrics.period_slug(metrics.PERIODO_PADRAO)
+    _gravar(os.path.join(destino, "index.html"),
+            f'<!DOCTYPE html><meta http-equiv="refresh" content="0; url={padrao}.html">')
+
+    manifest = {
+        "versao": viz.snapshot.version,
+        "fingerprint": viz.snapshot.fingerprint,
+        "atualizado_em": viz.snapshot.loaded_at.isoformat(timespec="seconds"),
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "periodos": arquivos,
+    }
+    _gravar(os.path.join(destino, "manifest.json"), json.dumps(manifest, ensure_ascii=False, indent=2, default=str))
+    return manifest
+
+
+def watch(store: SharedDataStore, destino: str, intervalo: float = INTERVALO_PADRAO, refresher=None) -> None:
+    """Regera os snapshots sempre que o data store publicar uma versão nova ou o dia virar.
+
+    Como no ETag da API, a chave inclui a data: os arquivos de "últimos N
+    dias" andam com o calendário mesmo sem gravação nova. Sem o refresher
+    em segundo plano, `refresher` (um DataRefresher) é verificado aqui, a
+    cada ciclo, para que versões novas cheguem ao data store.
+    """
+    ultima = None
+    while True:
+        if refresher is not None:
+            try:
+                refresher.check_once()
+            except Exception:
+                # mantém a versão atual; tenta de novo no próximo ciclo
+                logger.exception("falha ao verificar atualizações")
+
+        chave = (store.get().version, date.today())
+        if chave != ultima:
+            try:
+                generate_snapshots(store, destino)
+                ultima = chave
+                logger.info(f"snapshots estáticos da versão {chave[0]} ({chave[1]}) gravados em {destino}")
+            except Exception:
+                # mantém os arquivos anteriores; tenta de novo no próximo ciclo
+                logger.exception("falha ao gerar os snapshots estáticos")
+        time.sleep(intervalo)
+
+
+def main() -> int:
+    from monitoring.instrumentation import configure_logging
+    from queries.refresher import DataRefresher, start_refresher
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--destino", default=get_setting("SNAPSHOT_DIR", "static_snapshots"))
+    parser.add_argument("--once", action="store_true", help="gera para a versão atual e sai")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_PADRAO)
+    args = parser.parse_args()
+
+    configure_logging()
+    store = get_data_store()
+
+    if args.once:
+        manifest = generate_snapshots(store, args.destino)
+        print(f"versão {manifest['versao']}: {len(manifest['periodos'])} períodos em {args.destino}")
+        return 0
+
+    # o refresher publica as versões novas; o loop só acompanha o número da versão
+    refresher = None
+    if start_refresher(store) is None:
+        # REFRESH_INTERVAL_SECONDS=0: sem thread em segundo plano, o próprio loop verifica os metadados
+        logger.warning("refresher desligado; verificando atualizações a cada ciclo do watch")
+        refresher = DataRefresher(store, args.intervalo)
+    try:
+        watch(store, args.destino, args.intervalo, refresher)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
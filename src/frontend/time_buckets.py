@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+
+# Janela (em dias) até a qual cada granularidade é usada nos gráficos de evolução
+LIMITE_DIARIO = 90
+LIMITE_SEMANAL = 540
+
+# Quantidade máxima de pontos enviados ao navegador por série
+MAX_PONTOS = 120
+
+# Acima dessa quantidade de pontos os rótulos de texto em cada ponto são omitidos
+MAX_ROTULOS = 45
+
+GRANULARIDADES = {
+    "D": {"nome": "Diária", "periodo": "D", "pad": pd.Timedelta(days=1), "hover": "%d/%m/%Y"},
+    "W": {"nome": "Semanal", "periodo": "W-SUN", "pad": pd.Timedelta(days=4), "hover": "Semana de %d/%m/%Y"},
+    "M": {"nome": "Mensal", "periodo": "M", "pad": pd.Timedelta(days=15), "hover": "%m/%Y"},
+}
+
+
+def choose_bucket(min_dt, max_dt) -> str:
+    """Escolhe a granularidade (D, W ou M) a partir do tamanho da janela"""
+    if pd.isna(min_dt) or pd.isna(max_dt):
+        return "D"
+
+    dias = (pd.Timestamp(max_dt) - pd.Timestamp(min_dt)).days
+
+    if dias <= LIMITE_DIARIO:
+        return "D"
+    if dias <= LIMITE_SEMANAL:
+        return "W"
+    return "M"
+
+
+def bucket_series(df: pd.DataFrame, value_col: str, bucket: str, date_col: str = "DATA") -> pd.DataFrame:
+    """Soma value_col por bucket de tempo (dia, semana ISO ou mês).
+
+    O DATA resultante é o início do bucket (segunda-feira para semanas,
+    dia 1 para meses).
+    """
+    if df.empty:
+        return df[[date_col, value_col]].copy()
+
+    periodo = GRANULARIDADES[bucket]["periodo"]
+    inicio_bucket = pd.to_datetime(df[date_col]).dt.to_period(periodo).dt.start_time
+
+    serie = (
+        df.groupby(inicio_bucket)[value_col]
+        .sum()
+        .rename_axis(date_col)
+        .reset_index()
+        .sort_values(date_col)
+    )
+    return serie
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: retorna os índices dos pontos mantidos.
+
+    Mantém o primeiro e o último ponto e, em cada bucket intermediário, o
+    ponto que forma o maior triângulo com o ponto anterior e a média do
+    bucket seguinte — o que preserva picos e vales da série.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    indices = np.empty(threshold, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    # limites dos buckets intermediários (primeiro e último ponto ficam de fora)
+    limites = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    anterior = 0
+    for i in range(threshold - 2):
+        inicio, fim = limites[i], limites[i + 1]
+
+        # média do próximo bucket (ou o último ponto, no último bucket)
+        prox_inicio = fim
+        prox_fim = limites[i + 2] if i + 2 < len(limites) else n
+        media_x = x[prox_inicio:prox_fim].mean()
+        media_y = y[prox_inicio:prox_fim].mean()
+
+        areas = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(areas.argmax())
+        indices[i + 1] = anterior
+
+    return indices
+
+
+def downsample(df: pd.DataFrame, value_col: str, threshold: int = MAX_PONTOS, date_col: str = "DATA") -> pd.DataFrame:
+    """Reduz a série para no máximo `threshold` pontos usando LTTB"""
+    if len(df) <= threshold:
+        return df
+
+    x = pd.to_datetime(df[date_col]).to_numpy().astype("int64")
+    y = df[value_col].to_numpy()
+    return df.iloc[lttb(x, y, threshold)]
+
+
+def prepare_evolution_series(df: pd.DataFrame, value_col: str, date_col: str = "DATA", use_lttb: bool = True):
+    """Agrupa a série por dia/semana/mês conforme a janela e aplica LTTB.
+
+    Retorna (serie, bucket), onde bucket é a chave de GRANULARIDADES.
+    """
+    df = df[[date_col, value_col]].copy()
+    df[date_col] = pd.to_datetime(df[date_col])
+
+    bucket = choose_bucket(df[date_col].min(), df[date_col].max())
+    serie = bucket_series(df, value_col, bucket, date_col=date_col)
+
+    if use_lttb:
+        serie = downsample(serie, value_col, date_col=date_col)
+
+    return serie, bucket
@@ -0,0 +1,459 @@
+"""Ingestão contínua dos romaneios a partir de arquivos de texto.
+
+Acompanha um diretório (cada *.txt é uma conversa) ou um único arquivo de
+exportação de chat que vai crescendo, e passa as mensagens novas pelo mesmo
+pipeline do ingestao.ipynb, em geradores:
+
+    linhas → mensagens ("Romaneio dd/mm") → ProcessRomaneio → BuildDataFrames → lote
+
+Cada lote vira um append por tabela e, no fim, uma única atualização do
+resumo diário com os deltas das três tabelas (update_rollups_batch). O checkpoint guarda, por arquivo, o offset em bytes até onde tudo
+foi gravado e o hash do trecho logo antes dele, além dos hashes das últimas
+mensagens gravadas:
+
+- ao reiniciar, a leitura continua do offset, sem reprocessar o que passou;
+- se o arquivo foi trocado por uma exportação nova da mesma conversa (o
+  trecho antes do offset é igual), segue do mesmo ponto; se o conteúdo
+  mudou, relê do início e pula as mensagens cujo hash já foi gravado;
+- o lote em andamento fica registrado com as tabelas já gravadas, então uma
+  queda no meio do lote não grava de novo as tabelas que já tinham ido.
+
+A memória fica limitada pelo tamanho de uma leitura (LEITURA_MAX) e de um
+lote, não pelo tamanho do arquivo. Uma mensagem é considerada completa quando
+chega o próximo "Romaneio dd/mm" ou quando o arquivo fica SILENCIO segundos
+sem crescer; com os padrões, a mensagem chega às tabelas em até ~15 s.
+
+A partir de src/:
+
+    python -m ingestion.watcher caminho/da/pasta_ou_arquivo.txt
+    python -m ingestion.watcher conversa.txt --once     # processa o que houver e sai
+"""
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+from database.db_connection import get_setting
+from monitoring.instrumentation import timed
+from queries.rollups import DATASET
+from queries.rollups import ensure_rollup_schema, update_rollups_batch
+from queries.romaneio import BuildDataFrames, ProcessRomaneio, convert_types
+
+
+logger = logging.getLogger("dashboard.ingestao")
+
+TABELAS = {
+    "receitas": f"{DATASET}.RECEITAS",
+    "despesas": f"{DATASET}.DESPESAS",
+    "peso_notas": f"{DATASET}.PESO_NOTAS",
+}
+
+# intervalo (s) entre as leituras
+INTERVALO_PADRAO = 5
+# segundos sem o arquivo crescer para a última mensagem contar como completa
+SILENCIO_PADRAO = 10
+# mensagens por append
+LOTE_PADRAO = 200
+# bytes lidos de um arquivo por passada; o resto fica para a próxima
+LEITURA_MAX = 4 * 1024 ** 2
+# uma "mensagem" maior que isto não é romaneio (texto colado por engano)
+MENSAGEM_MAX = 64 * 1024
+# bytes antes do offset usados no hash que confere se o arquivo é o mesmo
+JANELA_HASH = 4096
+# hashes de mensagens gravadas mantidos no checkpoint
+HASHES_MAX = 20000
+
+CABECALHO = re.compile(rb"Romaneio\s+\d{2}/\d{2}")
+# data completa que as exportações de chat colocam antes de cada mensagem ("[15/12/2025, 18:32]", "15/12/25 18:32 -")
+DATA_CHAT = re.compile(r"(\d{2})/(\d{2})/(\d{2,4})\b")
+# início de uma mensagem nova do chat: "[15/12/2025, 18:32] Nome:" ou "15/12/2025 18:32 - Nome:"
+MARCA_CHAT = re.compile(rb"^\[?\d{2}/\d{2}/\d{2,4},?\s+\d{1,2}:\d{2}")
+
+
+@dataclass
+class Mensagem:
+    arquivo: str
+    inicio: int
+    fim: int
+    texto: str
+
+    @property
+    def hash(self) -> str:
+        normalizado = re.sub(r"\s+", " ", self.texto).strip()
+        return hashlib.sha256(normalizado.encode("utf-8")).hexdigest()[:16]
+
+
+def infer_year(texto: str, hoje: date | None = None) -> int:
+    """Ano do romaneio: o mais recente em que a data não cai depois da mensagem.
+
+    A referência é a data do chat no cabeçalho da mensagem, se houver (um
+    "Romaneio 31/12" enviado em 01/01/2027 é de 2026), e senão hoje.
+    """
+    cabecalho = texto.splitlines()[0] if texto else ""
+    data_chat = DATA_CHAT.search(cabecalho)
+    if data_chat:
+        dia_chat, mes_chat, ano_chat = map(int, data_chat.groups())
+        # exportações com ano de 2 dígitos ("15/12/25")
+        referencia = date(ano_chat + 2000 if ano_chat < 100 else ano_chat, mes_chat, dia_chat)
+    else:
+        referencia = hoje or date.today()
+
+    dia, mes = map(int, re.search(r"Romaneio\s+(\d{2})/(\d{2})", texto).groups())
+    return referencia.year - 1 if (mes, dia) > (referencia.month, referencia.day) else referencia.year
+
+
+# ---- pipeline ------------------------------------------------------------
+
+def read_lines(caminho: str, inicio: int, limite: int = LEITURA_MAX) -> Iterator[tuple[int, bytes]]:
+    """(offset do início da linha, linha) a partir de `inicio`, até ~`limite` bytes"""
+    with open(caminho, "rb") as arquivo:
+        arquivo.seek(inicio)
+        offset = inicio
+        for linha in arquivo:
+            # só linhas terminadas: a que está sendo escrita fica para a próxima passada
+            if not linha.endswith(b"\n"):
+                return
+            yield offset, linha
+            offset += len(linha)
+            if offset - inicio >= limite:
+                return
+
+
+def split_messages(caminho: str, linhas: Iterable[tuple[int, bytes]], fim_completo: int | None) -> Iterator[Mensagem | int]:
+    """Agrupa as linhas em mensagens que começam em "Romaneio dd/mm".
+
+    Uma mensagem termina no próximo romaneio ou na próxima linha com data e
+    hora do chat (outra mensagem da conversa), para que uma "Rota ..." ou um
+    "R$ ..." digitado depois não entre no romaneio. Também produz offsets
+    (int) de trechos sem romaneio que podem ser pulados. A última mensagem
+    só sai se terminar em `fim_completo` (o arquivo parou de crescer ali)
+    ou em outra mensagem do chat.
+    """
+    inicio, partes, tamanho, fim = None, [], 0, None
+    for offset, linha in linhas:
+        fim = offset + len(linha)
+        if CABECALHO.search(linha):
+            if inicio is not None:
+                yield Mensagem(caminho, inicio, offset, b"".join(partes).decode("utf-8", errors="replace"))
+            else:
+                # texto antes do primeiro romaneio (cabeçalho da exportação, conversa)
+                yield offset
+            inicio, partes, tamanho = offset, [linha], len(linha)
+        elif MARCA_CHAT.match(linha):
+            # mensagem do chat que não é romaneio: fecha o romaneio em aberto e é pulada
+            if inicio is not None:
+                yield Mensagem(caminho, inicio, offset, b"".join(partes).decode("utf-8", errors="replace"))
+                inicio, partes, tamanho = None, [], 0
+            yield fim
+        elif inicio is not None:
+            partes.append(linha)
+            tamanho += len(linha)
+            if tamanho > MENSAGEM_MAX:
+                logger.warning(f"{caminho}: trecho de {tamanho} bytes sem novo romaneio a partir do byte {inicio}; descartado")
+                inicio, partes, tamanho = None, [], 0
+                yield fim
+        else:
+            yield fim
+
+    if inicio is not None and fim is not None and fim == fim_completo:
+        yield Mensagem(caminho, inicio, fim, b"".join(partes).decode("utf-8", errors="replace"))
+
+
+def parse_messages(mensagens: Iterable[Mensagem | int], ano: int | None = None, rota: str | None = None) -> Iterator[tuple]:
+    """(mensagem, {tabela: DataFrame}) ou (mensagem, None) se não deu para ler o romaneio"""
+    for mensagem in mensagens:
+        if isinstance(mensagem, int):
+            yield mensagem, None
+            continue
+        try:
+            dados = ProcessRomaneio(mensagem.texto, year=ano or infer_year(mensagem.texto), rota=rota).process()
+            construtor = BuildDataFrames(dados)
+            yield mensagem, {
+                "receitas": construtor.build_df_receitas(),
+                "despesas": construtor.build_df_despesas(),
+                "peso_notas": construtor.build_df_peso_notas(),
+            }
+        except (AttributeError, IndexError, TypeError, ValueError):
+            # romaneio incompleto ou fora do formato (ver ProcessRomaneio)
+            logger.warning(f"{mensagem.arquivo}: romaneio ilegível no byte {mensagem.inicio}: {mensagem.texto[:60]!r}")
+            yield mensagem, None
+
+
+def batched(itens: Iterable, tamanho: int) -> Iterator[list]:
+    lote = []
+    for item in itens:
+        lote.append(item)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def combine_frames(lote: list[tuple]) -> dict[str, pd.DataFrame]:
+    """Um DataFrame por tabela com todos os romaneios lidos do lote, já com os tipos do schema"""
+    frames = {}
+    for chave in TABELAS:
+        partes = [tabelas[chave] for mensagem, tabelas in lote if tabelas is not None and not tabelas[chave].empty]
+        if partes:
+            frames[chave] = convert_types(pd.concat(partes, ignore_index=True), ["DATA", "CREATED_AT"])
+    return frames
+
+
+# ---- checkpoint ----------------------------------------------------------
+
+def _hash_trecho(caminho: str, inicio: int, fim: int) -> str:
+    with open(caminho, "rb") as arquivo:
+        arquivo.seek(inicio)
+        return hashlib.sha256(arquivo.read(fim - inicio)).hexdigest()
+
+
+def _hash_antes(caminho: str, offset: int) -> str:
+    return _hash_trecho(caminho, max(0, offset - JANELA_HASH), offset)
+
+
+class Checkpoint:
+    """Progresso da ingestão num JSON gravado de forma atômica (tmp + os.replace)"""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.arquivos: dict[str, dict] = {}
+        self.mensagens: list[str] = []
+        self.pendente: dict | None = None
+        if os.path.exists(caminho):
+            with open(caminho, encoding="utf-8") as arquivo:
+                dados = json.load(arquivo)
+            self.arquivos = dados.get("arquivos", {})
+            self.mensagens = dados.get("mensagens", [])
+            self.pendente = dados.get("pendente")
+        self._vistas = set(self.mensagens)
+
+    def offset(self, caminho: str) -> int:
+        """Onde continuar a leitura; 0 se o arquivo é novo ou mudou antes do ponto salvo"""
+        estado = self.arquivos.get(os.path.abspath(caminho))
+        if not estado:
+            return 0
+        if os.path.getsize(caminho) < estado["offset"] or _hash_antes(caminho, estado["offset"]) != estado["hash"]:
+            logger.warning(f"{caminho} mudou antes do ponto já lido; relendo do início (mensagens já gravadas são puladas)")
+            return 0
+        return estado["offset"]
+
+    def advance(self, caminho: str, offset: int, hashes: Iterable[str] = ()) -> None:
+        self.arquivos[os.path.abspath(caminho)] = {"offset": offset, "hash": _hash_antes(caminho, offset)}
+        for valor in hashes:
+            if valor not in self._vistas:
+                self._vistas.add(valor)
+                self.mensagens.append(valor)
+        if len(self.mensagens) > HASHES_MAX:
+            for valor in self.mensagens[:-HASHES_MAX]:
+                self._vistas.discard(valor)
+            self.mensagens = self.mensagens[-HASHES_MAX:]
+
+    def seen(self, mensagem: Mensagem) -> bool:
+        return mensagem.hash in self._vistas
+
+    def save(self) -> None:
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump({"arquivos": self.arquivos, "mensagens": self.mensagens, "pendente": self.pendente}, arquivo)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, self.caminho)
+
+
+# ---- worker --------------------------------------------------------------
+
+class IngestionWatcher:
+    """Lê os arquivos novos/crescidos a cada `intervalo` e grava os romaneios em lotes"""
+
+    def __init__(self, origem: str, backend=None, checkpoint: str | None = None, ano: int | None = None,
+                 rota: str | None = None, intervalo: float = INTERVALO_PADRAO, silencio: float = SILENCIO_PADRAO, lote: int = LOTE_PADRAO):
+        if backend is None:
+            from database.db_connection import get_data_backend
+            backend = get_data_backend()
+
+        self.origem = origem
+        self.backend = backend
+        self.ano = ano
+        self.rota = rota
+        self.intervalo = intervalo
+        self.silencio = silencio
+        self.lote = lote
+        self.checkpoint = Checkpoint(checkpoint or self.default_checkpoint(origem))
+        self._stop = threading.Event()
+
+    @staticmethod
+    def default_checkpoint(origem: str) -> str:
+        origem = os.path.abspath(origem)
+        if os.path.isdir(origem):
+            return os.path.join(origem, ".ingestao_checkpoint.json")
+        return f"{origem}.checkpoint.json"
+
+    def files(self) -> list[str]:
+        if os.path.isdir(self.origem):
+            return sorted(glob.glob(os.path.join(self.origem, "*.txt")), key=os.path.getmtime)
+        return [self.origem] if os.path.exists(self.origem) else []
+
+    def run_once(self) -> int:
+        """Uma passada por todos os arquivos; retorna quantos romaneios foram gravados"""
+        gravados = self._resume_pending()
+        for caminho in self.files():
+            gravados += self._ingest_file(caminho)
+        return gravados
+
+    def _ingest_file(self, caminho: str) -> int:
+        inicio = self.checkpoint.offset(caminho)
+        tamanho = os.path.getsize(caminho)
+        if inicio >= tamanho:
+            return 0
+
+        parado = time.time() - os.path.getmtime(caminho) >= self.silencio
+        itens = parse_messages(
+            split_messages(caminho, read_lines(caminho, inicio), tamanho if parado else None),
+            self.ano, self.rota,
+        )
+
+        gravados = 0
+        for lote in batched(itens, self.lote):
+            gravados += self._write_batch(caminho, inicio, lote)
+            inicio = self.checkpoint.arquivos[os.path.abspath(caminho)]["offset"]
+        return gravados
+
+    def _write_batch(self, caminho: str, inicio: int, lote: list[tuple]) -> int:
+        """Grava um lote e avança o checkpoint até o fim do último item"""
+        fim = max(item.fim if isinstance(item, Mensagem) else item for item, _ in lote)
+        novos = self._new_messages(lote)
+
+        if novos:
+            self.checkpoint.pendente = {
+                "arquivo": os.path.abspath(caminho),
+                "inicio": inicio,
+                "fim": fim,
+                "hash": _hash_trecho(caminho, inicio, fim),
+                "tabelas": [],
+            }
+            self.checkpoint.save()
+            self._append(combine_frames(novos), len(novos))
+
+        self.checkpoint.advance(caminho, fim, [mensagem.hash for mensagem, _ in novos])
+        self.checkpoint.pendente = None
+        self.checkpoint.save()
+        return len(novos)
+
+    def _new_messages(self, lote: list[tuple]) -> list[tuple]:
+        """Romaneios lidos que ainda não foram gravados (nem repetidos dentro do próprio lote)"""
+        novos, hashes = [], set()
+        for mensagem, tabelas in lote:
+            if tabelas is None or self.checkpoint.seen(mensagem) or mensagem.hash in hashes:
+                continue
+            hashes.add(mensagem.hash)
+            novos.append((mensagem, tabelas))
+        return novos
+
+    def _append(self, frames: dict[str, pd.DataFrame], mensagens: int) -> None:
+        """Um append por tabela e depois o resumo; cada etapa gravada é anotada no lote pendente antes da próxima"""
+        pendente = self.checkpoint.pendente
+        with timed("ingestao:lote", mensagens=mensagens):
+            if not pendente["tabelas"]:
+                # antes da primeira tabela do lote (ver ensure_rollup_schema)
+                ensure_rollup_schema(self.backend)
+            for chave, table_id in TABELAS.items():
+                if chave in pendente["tabelas"]:
+                    continue
+                if chave in frames:
+                    self.backend.append_df(frames[chave], table_id)
+                pendente["tabelas"].append(chave)
+                self.checkpoint.save()
+
+            if "resumos" not in pendente["tabelas"]:
+                # um único MERGE com os deltas das três tabelas
+                update_rollups_batch(self.backend, {TABELAS[chave]: df for chave, df in frames.items()})
+                pendente["tabelas"].append("resumos")
+                self.checkpoint.save()
+        logger.info(f"{mensagens} romaneio(s) gravado(s) de {os.path.basename(pendente['arquivo'])}")
+
+    def _resume_pending(self) -> int:
+        """Termina o lote interrompido por uma queda, sem repetir as tabelas já gravadas"""
+        pendente = self.checkpoint.pendente
+        if pendente is None:
+            return 0
+
+        caminho = pendente["arquivo"]
+        if not os.path.exists(caminho) or _hash_trecho(caminho, pendente["inicio"], pendente["fim"]) != pendente["hash"]:
+            logger.error(f"lote pendente de {caminho} não pode ser retomado (arquivo mudou); tabelas já gravadas: {pendente['tabelas']}")
+            self.checkpoint.pendente = None
+            self.checkpoint.save()
+            return 0
+
+        itens = list(parse_messages(
+            split_messages(caminho, read_lines(caminho, pendente["inicio"], pendente["fim"] - pendente["inicio"]), pendente["fim"]),
+            self.ano, self.rota,
+        ))
+        novos = self._new_messages(itens)
+        logger.info(f"retomando lote de {len(novos)} romaneio(s) de {caminho} (já gravadas: {pendente['tabelas']})")
+        self._append(combine_frames(novos), len(novos))
+
+        self.checkpoint.advance(caminho, pendente["fim"], [mensagem.hash for mensagem, _ in novos])
+        self.checkpoint.pendente = None
+        self.checkpoint.save()
+        return len(novos)
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                # falha de gravação: o checkpoint não avançou; tenta de novo na próxima passada
+                logger.exception("falha na ingestão")
+            self._stop.wait(self.intervalo)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def main() -> int:
+    from monitoring.instrumentation import configure_logging
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("origem", nargs="?", default=get_setting("INGEST_PATH"), help="pasta com *.txt ou arquivo de chat (padrão: INGEST_PATH)")
+    parser.add_argument("--checkpoint", help="arquivo do checkpoint (padrão: ao lado da origem)")
+    parser.add_argument("--ano", type=int, help="ano dos romaneios (padrão: data do chat ou o mais recente possível)")
+    parser.add_argument("--rota", help="rota/motorista dos romaneios (padrão: linha \"Rota ...\" do texto ou a rota padrão)")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_PADRAO)
+    parser.add_argument("--silencio", type=float, default=SILENCIO_PADRAO)
+    parser.add_argument("--lote", type=int, default=LOTE_PADRAO)
+    parser.add_argument("--once", action="store_true", help="processa o que houver e sai (a última mensagem conta como completa)")
+    args = parser.parse_args()
+
+    if not args.origem:
+        parser.error("informe a origem ou INGEST_PATH")
+
+    configure_logging()
+    watcher = IngestionWatcher(
+        args.origem, checkpoint=args.checkpoint, ano=args.ano, rota=args.rota,
+        intervalo=args.intervalo, silencio=0 if args.once else args.silencio, lote=args.lote,
+    )
+
+    if args.once:
+        print(f"{watcher.run_once()} romaneio(s) gravado(s)")
+        return 0
+
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
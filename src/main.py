@@ -1,10 +1,17 @@
-from frontend.dashboard import VizReceitas
+from monitoring.instrumentation import configure_logging, get_recorder
 
-viz_receitas = VizReceitas()
 
 def main():
+    # import aqui: o dashboard (e pandas/plotly/BigQuery por trás dele) só
+    # carrega quando o script roda, e os dados só dentro de render()
+    from frontend.dashboard import VizReceitas
+
+    configure_logging()
+    get_recorder().begin_run()
+
+    viz_receitas = VizReceitas()
     viz_receitas.render()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime
+
+
+logger = logging.getLogger("dashboard.perf")
+
+# Quantidade de medições guardadas por seção para o cálculo de p50/p95
+HISTORICO_POR_SECAO = 500
+
+
+class PerfRecorder:
+    """Acumula as medições de tempo por seção e as estatísticas das queries.
+
+    O histórico é do processo (compartilhado entre sessões) e serve para
+    p50/p95; as medições da execução atual do script ficam por thread, já
+    que o Streamlit executa cada rerun de uma sessão na sua própria thread.
+    """
+
+    def __init__(self, historico: int = HISTORICO_POR_SECAO):
+        self._lock = threading.Lock()
+        self._historico = defaultdict(lambda: deque(maxlen=historico))
+        self._queries = deque(maxlen=historico)
+        self._local = threading.local()
+
+    # ---- execução atual -------------------------------------------------
+    def begin_run(self) -> None:
+        self._local.run = []
+
+    def current_run(self) -> list[dict]:
+        return list(getattr(self._local, "run", []))
+
+    # ---- registro -------------------------------------------------------
+    def record(self, secao: str, duracao_ms: float, **extra) -> dict:
+        evento = {
+            "event": "timing",
+            "secao": secao,
+            "duracao_ms": round(duracao_ms, 2),
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            **extra,
+        }
+
+        with self._lock:
+            self._historico[secao].append(duracao_ms)
+            if "bytes_processados" in extra:
+                self._queries.append(evento)
+
+        getattr(self._local, "run", []).append(evento)
+        logger.info(json.dumps(evento, default=str, ensure_ascii=False))
+        return evento
+
+    # ---- consulta -------------------------------------------------------
+    def summary(self) -> list[dict]:
+        """p50/p95 por seção com base no histórico do processo"""
+        import numpy as np
+
+        with self._lock:
+            historico = {secao: list(valores) for secao, valores in self._historico.items()}
+
+        resumo = []
+        for secao, valores in sorted(historico.items()):
+            resumo.append({
+                "secao": secao,
+                "n": len(valores),
+                "p50_ms": round(float(np.percentile(valores, 50)), 2),
+                "p95_ms": round(float(np.percentile(valores, 95)), 2),
+            })
+        return resumo
+
+    def query_stats(self) -> list[dict]:
+        with self._lock:
+            return list(self._queries)
+
+
+_recorder = PerfRecorder()
+
+
+def get_recorder() -> PerfRecorder:
+    return _recorder
+
+
+@contextmanager
+def timed(secao: str, **extra):
+    """Mede o tempo do bloco e registra no PerfRecorder do processo"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _recorder.record(secao, (time.perf_counter() - inicio) * 1000, **extra)
+
+
+def record_query_job(nome: str, job, duracao_ms: float) -> dict:
+    """Registra as estatísticas que o BigQuery devolve no QueryJob"""
+    return _recorder.record(
+        f"query:{nome}",
+        duracao_ms,
+        bytes_processados=getattr(job, "total_bytes_processed", None),
+        slot_ms=getattr(job, "slot_millis", None),
+        cache_hit=getattr(job, "cache_hit", None),
+    )
+
+
+def record_cache_lookup(nome: str, hit: bool, duracao_ms: float) -> dict:
+    """Registra se a query foi servida pelo cache local (QueryExecutor)"""
+    return _recorder.record(f"cache:{nome}", duracao_ms, resultado="hit" if hit else "miss")
+
+
+def debug_enabled(query_params=None) -> bool:
+    """Painel de debug liga com DASHBOARD_DEBUG=1 ou ?debug=1 na URL"""
+    if os.getenv("DASHBOARD_DEBUG", "").lower() in ("1", "true", "sim"):
+        return True
+    if query_params is not None:
+        return str(query_params.get("debug", "")).lower() in ("1", "true", "sim")
+    return False
+
+
+def configure_logging() -> None:
+    """Envia os logs estruturados de desempenho para o stderr (uma linha JSON por evento)"""
+    base = logging.getLogger("dashboard")
+    if base.handlers:
+        return
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    base.addHandler(handler)
+    base.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    base.propagate = False
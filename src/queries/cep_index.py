@@ -0,0 +1,118 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# CEPs são identificados pelo prefixo de 3 dígitos (000 a 999)
+CEP_MAX = 999
+
+
+def parse_ceps(texto) -> tuple[int, int] | None:
+    """Faixa (início, fim) a partir da coluna CEPS.
+
+    Aceita o formato compacto atual ("030-034") e o antigo, com a lista
+    expandida ("30, 31, 32, 33, 34").
+    """
+    if not isinstance(texto, str) or not texto.strip():
+        return None
+
+    faixa = re.fullmatch(r"\s*(\d{1,3})\s*-\s*(\d{1,3})\s*", texto)
+    if faixa:
+        return int(faixa.group(1)), int(faixa.group(2))
+
+    numeros = [int(n) for n in re.findall(r"\d+", texto)]
+    return (min(numeros), max(numeros)) if numeros else None
+
+
+def cep_ranges(receitas: pd.DataFrame) -> pd.DataFrame:
+    """DATA, VALOR_TOTAL, CEP_INICIO e CEP_FIM de cada romaneio com faixa de CEPs.
+
+    Usa as colunas inteiras quando existem e cai para a coluna CEPS nas
+    linhas gravadas antes delas. Faixas invertidas (início > fim, gravadas
+    antes de set_ceps ordenar os extremos) são desinvertidas.
+    """
+    inicio = receitas["CEP_INICIO"] if "CEP_INICIO" in receitas.columns else pd.Series(np.nan, index=receitas.index)
+    fim = receitas["CEP_FIM"] if "CEP_FIM" in receitas.columns else pd.Series(np.nan, index=receitas.index)
+
+    sem_faixa = inicio.isna() | fim.isna()
+    if sem_faixa.any() and "CEPS" in receitas.columns:
+        faixas = receitas.loc[sem_faixa, "CEPS"].map(parse_ceps)
+        inicio = inicio.astype(float).copy()
+        fim = fim.astype(float).copy()
+        inicio.loc[sem_faixa] = faixas.map(lambda f: f[0] if f else np.nan)
+        fim.loc[sem_faixa] = faixas.map(lambda f: f[1] if f else np.nan)
+
+    faixas = pd.DataFrame({
+        "DATA": pd.to_datetime(receitas["DATA"]),
+        "VALOR_TOTAL": receitas["VALOR_TOTAL"].astype(float),
+        "CEP_INICIO": inicio,
+        "CEP_FIM": fim,
+    }).dropna(subset=["CEP_INICIO", "CEP_FIM"])
+
+    extremos = faixas[["CEP_INICIO", "CEP_FIM"]].astype(int).to_numpy()
+    faixas["CEP_INICIO"] = extremos.min(axis=1)
+    faixas["CEP_FIM"] = extremos.max(axis=1)
+    return faixas.reset_index(drop=True)
+
+
+class CepCoverageIndex:
+    """Índice de intervalos sobre as faixas de CEP atendidas em cada romaneio.
+
+    `rows_for_cep` usa um IntervalIndex (árvore de intervalos no pandas),
+    sem varrer strings; `receita_por_cep` distribui a receita pelos CEPs
+    com somas de diferenças, em O(romaneios + CEPs).
+    """
+
+    def __init__(self, receitas: pd.DataFrame):
+        self.faixas = cep_ranges(receitas)
+        self.intervalos = pd.IntervalIndex.from_arrays(
+            self.faixas["CEP_INICIO"], self.faixas["CEP_FIM"], closed="both"
+        )
+
+    def __len__(self) -> int:
+        return len(self.faixas)
+
+    def rows_for_cep(self, cep: int, data_inicio=None) -> pd.DataFrame:
+        """Romaneios (DATA, VALOR_TOTAL, faixa) que atenderam o CEP"""
+        if self.faixas.empty:
+            return self.faixas
+
+        posicoes, _ = self.intervalos.get_indexer_non_unique([cep])
+        linhas = self.faixas.iloc[posicoes[posicoes >= 0]]
+
+        if data_inicio is not None and pd.notna(data_inicio):
+            linhas = linhas[linhas["DATA"] >= data_inicio]
+        return linhas.sort_values("DATA", ascending=False)
+
+    def receita_por_cep(self, data_inicio=None) -> pd.DataFrame:
+        """Por CEP: dias atendidos, receita dos dias (cheia) e receita rateada.
+
+        A receita rateada divide o valor de cada romaneio igualmente entre
+        os CEPs da faixa, então a soma por CEP bate com a receita total.
+        """
+        faixas = self.faixas
+        if data_inicio is not None and pd.notna(data_inicio):
+            faixas = faixas[faixas["DATA"] >= data_inicio]
+
+        inicio = faixas["CEP_INICIO"].to_numpy().clip(0, CEP_MAX)
+        fim = faixas["CEP_FIM"].to_numpy().clip(0, CEP_MAX)
+        valor = faixas["VALOR_TOTAL"].to_numpy()
+        largura = fim - inicio + 1
+
+        def acumular(pesos):
+            # +peso no início da faixa, -peso logo após o fim; a soma acumulada dá o valor por CEP
+            diff = np.zeros(CEP_MAX + 2)
+            np.add.at(diff, inicio, pesos)
+            np.add.at(diff, fim + 1, -pesos)
+            return np.cumsum(diff)[:CEP_MAX + 1]
+
+        resultado = pd.DataFrame({
+            "CEP": np.arange(CEP_MAX + 1),
+            "DIAS": acumular(np.ones(len(faixas))).round().astype(int),
+            "RECEITA": acumular(valor),
+            "RECEITA_RATEADA": acumular(valor / largura),
+        })
+        resultado = resultado[resultado["DIAS"] > 0].reset_index(drop=True)
+        resultado["CEP_LABEL"] = resultado["CEP"].map(lambda c: f"{c:03d}")
+        return resultado
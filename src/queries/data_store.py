@@ -0,0 +1,472 @@
+import logging
+import threading
+import weakref
+from datetime import datetime, timedelta
+from functools import partial
+
+import pandas as pd
+
+from database.db_connection import get_setting
+from queries.get_data import BusinessData
+from queries.rollups import CHAVES, combine_routes, rollup_to_frames
+from queries.romaneio import rota_column
+from queries.rolling_metrics import RollingMetrics, daily_delta
+from monitoring.instrumentation import timed
+
+
+logger = logging.getLogger("dashboard.data_store")
+
+class DataSnapshot:
+    """Uma versão imutável das tabelas, compartilhada por todas as sessões.
+
+    Os DataFrames devem ser tratados como somente leitura: quem precisar
+    alterar colunas trabalha sobre uma cópia (como já fazem os show_*).
+    Os recortes por período também ficam aqui, então sessões com o mesmo
+    filtro compartilham o mesmo recorte em vez de cada uma criar o seu.
+
+    `rota(nome)` devolve a partição da rota: outro DataSnapshot da mesma
+    versão, com os próprios recortes, índice de CEPs e médias móveis, que
+    só olha as linhas daquela rota. `por_rota` são os frames (com ROTA) de
+    onde as partições saem quando os frames da versão já vêm combinados
+    por dia (resumo da frota).
+
+    Com o resumo, o índice de CEPs sai de `carregar_ceps` (só as colunas de
+    faixa e valor de RECEITAS), sem passar pelas linhas brutas do drill-down,
+    e `resumo` guarda as linhas por dia e rota de onde a versão saiu (base
+    da próxima carga incremental).
+    """
+
+    def __init__(self, version: int, receitas: pd.DataFrame, despesas: pd.DataFrame, peso_notas: pd.DataFrame,
+                 fingerprint: dict | None = None, fonte: str = "bruto", carregar_bruto=None, rolling_base=None,
+                 por_rota: tuple | None = None, nome_rota: str | None = None, carregar_ceps=None,
+                 resumo: pd.DataFrame | None = None, rolling_base_rotas: dict | None = None):
+        self.version = version
+        self.receitas = receitas
+        self.despesas = despesas
+        self.peso_notas = peso_notas
+        # metadados das tabelas no momento da carga (ver BusinessData.fingerprint)
+        self.fingerprint = fingerprint
+        # "resumo": frames vindos de RESUMO_DIARIO; "bruto": tabelas originais
+        self.fonte = fonte
+        self.resumo = resumo
+        self.loaded_at = datetime.now() - timedelta(hours=3)
+        self._carregar_bruto = carregar_bruto
+        self._bruto: DataSnapshot | None = None
+        self._carregar_ceps = carregar_ceps
+        self._cep_index = None
+        # (RollingMetrics da versão anterior, delta por dia) quando veio da carga incremental
+        self._rolling_base = rolling_base
+        # o mesmo, por rota, para as partições
+        self._rolling_base_rotas = rolling_base_rotas or {}
+        self._rolling = None
+        # None: frota inteira
+        self.nome_rota = nome_rota
+        self._por_rota = por_rota
+        self._particoes = None
+        self._recortes = {}
+        self._lock = threading.Lock()
+        # um lock por atributo montado sob demanda: a query do índice de CEPs
+        # não segura rotas()/rota() nem as médias móveis da mesma versão
+        self._bruto_lock = threading.Lock()
+        self._cep_lock = threading.Lock()
+        self._rolling_lock = threading.Lock()
+        self._particoes_lock = threading.Lock()
+
+    def detalhado(self) -> "DataSnapshot":
+        """Linhas brutas da mesma versão, para drill-down (carregadas uma vez, sob demanda)"""
+        if self.fonte == "bruto":
+            return self
+        if self._bruto is not None:
+            return self._bruto
+
+        with self._bruto_lock:
+            if self._bruto is None:
+                self._bruto = self._carregar_bruto(self.version)
+            return self._bruto
+
+    def cep_index(self):
+        """Índice de cobertura de CEPs desta versão (construído uma vez, sob demanda)"""
+        from queries.cep_index import CepCoverageIndex
+
+        if self._cep_index is not None:
+            return self._cep_index
+
+        with self._cep_lock:
+            if self._cep_index is None:
+                with timed("cep_index", rota=self.nome_rota):
+                    if self.fonte == "bruto":
+                        receitas = self.receitas
+                    else:
+                        receitas = _garantir_tipos(self._carregar_ceps(rota=self.nome_rota))
+                    self._cep_index = CepCoverageIndex(receitas)
+            return self._cep_index
+
+    def rolling(self):
+        """Médias móveis/crescimento desta versão: incremental sobre a anterior quando possível"""
+        if self._rolling is not None:
+            return self._rolling
+
+        with self._rolling_lock:
+            if self._rolling is None:
+                if self._rolling_base is not None:
+                    base, delta = self._rolling_base
+                    with timed("rolling_metrics", modo="incremental", dias=len(delta)):
+                        self._rolling = base.apply_delta(delta)
+                else:
+                    with timed("rolling_metrics", modo="completo"):
+                        self._rolling = RollingMetrics.from_frames(self.receitas, self.despesas)
+                self._rolling_base = None
+            return self._rolling
+
+    def rotas(self) -> list[str]:
+        """Rotas com romaneio nesta versão"""
+        return sorted(self._partition())
+
+    def rota(self, nome: str | None) -> "DataSnapshot":
+        """Partição da rota (a própria versão para None)"""
+        if nome is None or nome == self.nome_rota:
+            return self
+        particao = self._partition().get(nome)
+        if particao is None:
+            raise KeyError(f"rota sem dados nesta versão: {nome}")
+        return particao
+
+    def _partition(self) -> dict[str, "DataSnapshot"]:
+        # um groupby por tabela divide todas as rotas de uma vez; feito uma vez por versão, sob demanda
+        if self._particoes is not None:
+            return self._particoes
+
+        with self._particoes_lock:
+            if self._particoes is None:
+                with timed("particoes_rota", versao=self.version):
+                    frames = self._por_rota or (self.receitas, self.despesas, self.peso_notas)
+                    grupos = [dict(list(df.groupby(rota_column(df), sort=False))) for df in frames]
+
+                    # montado à parte e publicado inteiro: leitores fora do lock nunca veem o dict pela metade
+                    particoes = {}
+                    for nome in set().union(*grupos):
+                        receitas, despesas, peso_notas = (
+                            grupo.get(nome, df.iloc[0:0]) for grupo, df in zip(grupos, frames)
+                        )
+                        particao = DataSnapshot(
+                            self.version, receitas, despesas, peso_notas, self.fingerprint,
+                            fonte=self.fonte,
+                            # drill-down da rota lê só as linhas dela (parâmetro @rota)
+                            carregar_bruto=partial(self._carregar_bruto, rota=nome) if self._carregar_bruto else None,
+                            nome_rota=nome,
+                            carregar_ceps=self._carregar_ceps,
+                            rolling_base=self._rolling_base_rotas.get(nome),
+                        )
+                        particao.loaded_at = self.loaded_at
+                        particoes[nome] = particao
+                    self._particoes = particoes
+                    self._rolling_base_rotas = {}
+            return self._particoes
+
+    def since(self, data_inicio) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """(receitas, despesas, peso_notas) com DATA >= data_inicio"""
+        # DATA não tem horário, então DATA >= t equivale a DATA >= t arredondado para cima
+        chave = pd.Timestamp(data_inicio).ceil("D") if pd.notna(data_inicio) else None
+
+        with self._lock:
+            recorte = self._recortes.get(chave)
+
+        if recorte is None:
+            recorte = tuple(self._filter(df, chave) for df in (self.receitas, self.despesas, self.peso_notas))
+            with self._lock:
+                recorte = self._recortes.setdefault(chave, recorte)
+
+        return recorte
+
+    @staticmethod
+    def _filter(df: pd.DataFrame, data_inicio) -> pd.DataFrame:
+        if data_inicio is None or df.empty or 'DATA' not in df.columns:
+            return df
+        if df['DATA'].min() >= data_inicio:
+            # período cobre a tabela toda: reaproveita o próprio frame
+            return df
+        return df[df['DATA'] >= data_inicio]
+
+
+def _garantir_tipos(df: pd.DataFrame) -> pd.DataFrame:
+    for coluna in ('DATA', 'CREATED_AT'):
+        if coluna in df.columns:
+            df[coluna] = pd.to_datetime(df[coluna])
+    return df
+
+
+def load_raw_snapshot(version: int, business_data: BusinessData | None = None, fingerprint: dict | None = None,
+                      rota: str | None = None) -> DataSnapshot:
+    """Versão a partir das tabelas brutas RECEITAS/DESPESAS/PESO_NOTAS (só da rota, se informada)"""
+    with timed("carga_dados", rota=rota):
+        business_data = business_data or BusinessData()
+        receitas = _garantir_tipos(business_data.get_receitas(rota=rota))
+        despesas = _garantir_tipos(business_data.get_despesas(rota=rota))
+        peso_notas = _garantir_tipos(business_data.get_peso_notas(rota=rota))
+
+    return DataSnapshot(version, receitas, despesas, peso_notas, fingerprint, nome_rota=rota)
+
+
+def load_snapshot(version: int, business_data: BusinessData | None = None) -> DataSnapshot:
+    """Lê o resumo diário quando existe (uma linha por dia e rota) e cai para as tabelas brutas.
+
+    Os frames da versão são os totais da frota por dia (linhas das rotas
+    somadas); as partições por rota saem das linhas de cada rota.
+    """
+    business_data = business_data or BusinessData()
+    # metadados antes dos dados: uma gravação no meio da carga só gera uma atualização a mais
+    fingerprint = business_data.fingerprint()
+
+    if get_setting("USE_ROLLUPS", "1") != "0":
+        with timed("carga_resumo"):
+            resumo = business_data.get_resumo()
+
+        if resumo is not None and not resumo.empty:
+            return _rollup_snapshot(version, resumo, business_data, fingerprint)
+
+    return load_raw_snapshot(version, business_data, fingerprint)
+
+
+def _rollup_snapshot(version: int, resumo: pd.DataFrame, business_data: BusinessData, fingerprint: dict,
+                     **kwargs) -> DataSnapshot:
+    receitas, despesas, peso_notas = rollup_to_frames(combine_routes(resumo))
+    return DataSnapshot(
+        version, receitas, despesas, peso_notas, fingerprint,
+        fonte="resumo",
+        carregar_bruto=lambda v, rota=None: load_raw_snapshot(v, business_data, fingerprint, rota),
+        por_rota=rollup_to_frames(resumo),
+        carregar_ceps=business_data.get_cep_faixas,
+        resumo=resumo,
+        **kwargs,
+    )
+
+
+def _rolling_bases(anterior: DataSnapshot, adicionadas: tuple, removidas: tuple) -> dict:
+    """rolling_base (frota) e rolling_base_rotas da nova versão, a partir das linhas que entraram/saíram.
+
+    `adicionadas`/`removidas` são (receitas, despesas) com ROTA. Só as
+    médias móveis já calculadas na versão anterior (da frota e de cada
+    partição) servem de base; as demais são calculadas do zero se usadas.
+    """
+    def delta(rota=None):
+        def filtrar(df):
+            if rota is None or df is None or df.empty:
+                return df
+            return df[rota_column(df) == rota]
+
+        return daily_delta(*map(filtrar, adicionadas)).add(
+            daily_delta(*map(filtrar, removidas), sinal=-1), fill_value=0
+        )
+
+    bases = {"rolling_base": None, "rolling_base_rotas": {}}
+    if anterior._rolling is not None:
+        bases["rolling_base"] = (anterior._rolling, delta())
+    for nome, particao in (anterior._particoes or {}).items():
+        if particao._rolling is not None:
+            bases["rolling_base_rotas"][nome] = (particao._rolling, delta(nome))
+    return bases
+
+
+def load_incremental(version: int, anterior: DataSnapshot, business_data: BusinessData) -> DataSnapshot | None:
+    """Nova versão lendo só as linhas gravadas desde a última carga.
+
+    As tabelas só recebem append, então basta buscar as linhas com
+    CREATED_AT >= maior CREATED_AT já carregado (o dia da marca é relido
+    inteiro, já que CREATED_AT é uma data). Retorna None quando não dá para
+    garantir o resultado (tabela sem CREATED_AT, linhas removidas...), e
+    aí quem chamou faz a carga completa.
+    """
+    if anterior.fonte == "resumo":
+        return _load_incremental_resumo(version, anterior, business_data)
+
+    with timed("carga_incremental"):
+        fingerprint = business_data.fingerprint()
+        atuais = {"receitas": anterior.receitas, "despesas": anterior.despesas, "peso_notas": anterior.peso_notas}
+        getters = {
+            "receitas": business_data.get_receitas,
+            "despesas": business_data.get_despesas,
+            "peso_notas": business_data.get_peso_notas,
+        }
+
+        novos = {}
+        adicionadas, removidas = {}, {}
+        for nome, df in atuais.items():
+            meta = fingerprint[nome]
+            if anterior.fingerprint and anterior.fingerprint.get(nome) == meta:
+                novos[nome] = df
+                continue
+
+            if df.empty or 'CREATED_AT' not in df.columns or df['CREATED_AT'].isna().any():
+                return None
+
+            marca = df['CREATED_AT'].max().normalize()
+            recentes = _garantir_tipos(getters[nome](desde=marca))
+            combinado = pd.concat([df[df['CREATED_AT'] < marca], recentes], ignore_index=True)
+
+            if meta.get("num_rows") is not None and len(combinado) != meta["num_rows"]:
+                return None
+            novos[nome] = combinado
+            adicionadas[nome], removidas[nome] = recentes, df[df['CREATED_AT'] >= marca]
+
+        # só as linhas que entraram/saíram: a nova versão das médias móveis parte da anterior
+        bases = _rolling_bases(
+            anterior,
+            (adicionadas.get("receitas"), adicionadas.get("despesas")),
+            (removidas.get("receitas"), removidas.get("despesas")),
+        )
+
+    return DataSnapshot(version, novos["receitas"], novos["despesas"], novos["peso_notas"], fingerprint, **bases)
+
+
+def _load_incremental_resumo(version: int, anterior: DataSnapshot, business_data: BusinessData) -> DataSnapshot | None:
+    """Como load_incremental, sobre o resumo diário.
+
+    Cada gravação marca com CREATED_AT os buckets (dia, rota) em que somou,
+    então as linhas com CREATED_AT >= a maior marca já carregada substituem
+    as da versão anterior com a mesma chave; as outras não mudaram. As
+    médias móveis recebem só a diferença desses buckets.
+    """
+    resumo = anterior.resumo
+    if resumo is None or resumo.empty or resumo["CREATED_AT"].isna().any():
+        return None
+
+    with timed("carga_incremental", fonte="resumo"):
+        fingerprint = business_data.fingerprint()
+        marca = resumo["CREATED_AT"].max().normalize()
+        recentes = business_data.get_resumo(desde=marca)
+        if recentes is None:
+            return None
+
+        trocadas = pd.MultiIndex.from_frame(resumo[CHAVES]).isin(pd.MultiIndex.from_frame(recentes[CHAVES]))
+        novo = pd.concat([resumo[~trocadas], recentes], ignore_index=True).sort_values(CHAVES, ignore_index=True)
+
+        meta = fingerprint.get("resumo") or {}
+        if meta.get("num_rows") is not None and len(novo) != meta["num_rows"]:
+            return None
+
+        bases = _rolling_bases(anterior, rollup_to_frames(recentes)[:2], rollup_to_frames(resumo[trocadas])[:2])
+
+    return _rollup_snapshot(version, novo, business_data, fingerprint, **bases)
+
+
+class SharedDataStore:
+    """Guarda a versão atual dos dados para o processo inteiro.
+
+    As sessões só mantêm uma referência ao DataSnapshot que estão usando;
+    a troca de versão é atômica e versões antigas são liberadas pelo
+    coletor assim que nenhuma sessão as referencia mais.
+    """
+
+    def __init__(self, loader=load_snapshot):
+        self._loader = loader
+        self._current: DataSnapshot | None = None
+        self._version = 0
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._vivas = weakref.WeakValueDictionary()
+        self._refresh_thread: threading.Thread | None = None
+        self.last_error: Exception | None = None
+
+    @property
+    def version(self) -> int:
+        return self._current.version if self._current else 0
+
+    @property
+    def refreshing(self) -> bool:
+        return self._refresh_thread is not None and self._refresh_thread.is_alive()
+
+    def get(self) -> DataSnapshot:
+        """Versão atual; carrega na primeira chamada (uma única carga por vez)"""
+        snapshot = self._current
+        if snapshot is not None:
+            return snapshot
+
+        with self._load_lock:
+            if self._current is None:
+                self._load()
+            return self._current
+
+    def reload(self) -> DataSnapshot:
+        """Carrega uma nova versão e a publica; sessões pegam a nova no próximo rerun"""
+        with self._load_lock:
+            return self._load()
+
+    def refresh_incremental(self, business_data: BusinessData) -> DataSnapshot:
+        """Atualiza lendo só as linhas novas; cai para a carga completa se necessário"""
+        with self._load_lock:
+            anterior = self._current
+            if anterior is None:
+                return self._load()
+
+            with self._lock:
+                self._version += 1
+                version = self._version
+
+            snapshot = load_incremental(version, anterior, business_data)
+            if snapshot is None:
+                logger.info("carga incremental não aplicável; fazendo carga completa")
+                snapshot = load_snapshot(version, business_data)
+
+            with self._lock:
+                self._swap(snapshot)
+            return snapshot
+
+    def refresh_async(self) -> bool:
+        """Recarrega em segundo plano (stale-while-revalidate).
+
+        As sessões continuam usando a versão atual enquanto a nova é
+        carregada. Se já houver uma atualização em andamento, não dispara
+        outra e retorna False.
+        """
+        with self._lock:
+            if self.refreshing:
+                return False
+            self._refresh_thread = threading.Thread(target=self._refresh_worker, name="data-refresh", daemon=True)
+            self._refresh_thread.start()
+        return True
+
+    def _refresh_worker(self) -> None:
+        try:
+            snapshot = self.reload()
+            self.last_error = None
+            logger.info(f"dados atualizados para a versão {snapshot.version}")
+        except Exception as erro:
+            # mantém a versão anterior em uso; o erro aparece para quem pediu a atualização
+            self.last_error = erro
+            logger.exception("falha ao atualizar os dados")
+
+    def publish(self, receitas: pd.DataFrame, despesas: pd.DataFrame, peso_notas: pd.DataFrame) -> DataSnapshot:
+        """Publica frames já carregados como uma nova versão"""
+        with self._lock:
+            self._version += 1
+            snapshot = DataSnapshot(self._version, receitas, despesas, peso_notas)
+            self._swap(snapshot)
+        return snapshot
+
+    def live_versions(self) -> list[int]:
+        """Versões ainda referenciadas por alguma sessão (ou pela atual)"""
+        return sorted(self._vivas.keys())
+
+    def _load(self) -> DataSnapshot:
+        with self._lock:
+            self._version += 1
+            version = self._version
+
+        snapshot = self._loader(version)
+        with self._lock:
+            self._swap(snapshot)
+        return snapshot
+
+    def _swap(self, snapshot: DataSnapshot) -> None:
+        # nunca volta para uma versão mais antiga que a publicada
+        if self._current is not None and self._current.version > snapshot.version:
+            return
+        self._current = snapshot
+        self._vivas[snapshot.version] = snapshot
+
+
+_store = SharedDataStore()
+
+
+def get_data_store() -> SharedDataStore:
+    return _store
@@ -1,42 +1,94 @@
 
 import sys
 import os
+import pandas as pd
 # Caminho para o root do projeto
 root_path = os.path.abspath("..")   # sobe 1 nível — ajuste se precisar
 
 sys.path.append(root_path)
 
-from database.db_connection import get_bigquery_client
+from database.backends import DataBackend
+from database.query_cache import QueryExecutor, build_executor, get_query_executor
+from monitoring.instrumentation import timed
+from queries.romaneio import ROTA_PADRAO
+
+
+TABELAS = {
+    "receitas": "SBOX_ISRAEL.RECEITAS",
+    "despesas": "SBOX_ISRAEL.DESPESAS",
+    "peso_notas": "SBOX_ISRAEL.PESO_NOTAS",
+}
+
+# colunas de RECEITAS usadas pelo índice de CEPs (CEPS: linhas anteriores a CEP_INICIO/CEP_FIM)
+COLUNAS_CEP = ["DATA", "VALOR_TOTAL", "CEPS", "CEP_INICIO", "CEP_FIM"]
 
 
 class BusinessData:
-    def __init__(self):
-        self.client = get_bigquery_client()
+    def __init__(self, backend: DataBackend | None = None):
+        with timed("backend:client"):
+            # sem backend explícito, usa o executor (e o cache) compartilhado do processo
+            self.executor: QueryExecutor = build_executor(backend) if backend is not None else get_query_executor()
+            self.backend = self.executor.backend
 
-    def get_receitas(self):
+    def _get_table(self, nome: str, table_id: str, desde=None, rota: str | None = None, colunas: list[str] | None = None):
+        query = f"SELECT {', '.join(colunas) if colunas else '*'} FROM {table_id}"
+        condicoes, params = [], {}
 
-        query = "SELECT * FROM SBOX_ISRAEL.RECEITAS"
+        if desde is not None:
+            # carga incremental: só o que foi gravado a partir de `desde`
+            condicoes.append("CAST(CREATED_AT AS DATE) >= @desde")
+            params["desde"] = pd.Timestamp(desde).normalize()
 
-        df = self.client.query(query).to_dataframe()
+        if rota is not None:
+            # só a fatia da rota; linhas sem ROTA (anteriores à coluna) são da rota padrão
+            condicoes.append("COALESCE(ROTA, @rota_padrao) = @rota")
+            params.update(rota=rota, rota_padrao=ROTA_PADRAO)
 
-        return df
+        if condicoes:
+            query += " WHERE " + " AND ".join(condicoes)
 
-    def get_despesas(self):
+        return self.executor.query(query, params or None, nome=nome)
 
-        query = "SELECT * FROM SBOX_ISRAEL.DESPESAS"
+    def get_receitas(self, desde=None, rota: str | None = None):
 
-        df = self.client.query(query).to_dataframe()
+        df = self._get_table("receitas", TABELAS["receitas"], desde, rota)
 
         return df
-    
-    def get_peso_notas(self):
 
-        query = "SELECT * FROM SBOX_ISRAEL.PESO_NOTAS"
+    def get_despesas(self, desde=None, rota: str | None = None):
 
-        df = self.client.query(query).to_dataframe()
+        df = self._get_table("despesas", TABELAS["despesas"], desde, rota)
 
         return df
+    
+    def get_peso_notas(self, desde=None, rota: str | None = None):
+
+        df = self._get_table("peso_notas", TABELAS["peso_notas"], desde, rota)
+
+        return df
+
+    def get_cep_faixas(self, rota: str | None = None):
+        """Só as colunas de RECEITAS que o índice de CEPs usa, sem carregar as linhas brutas inteiras"""
+        existentes = set(self.backend.table_columns(TABELAS["receitas"]))
+        colunas = [coluna for coluna in COLUNAS_CEP if coluna in existentes]
+
+        return self._get_table("cep_faixas", TABELAS["receitas"], rota=rota, colunas=colunas)
 
+    def fingerprint(self) -> dict:
+        """Metadados das três tabelas e do resumo diário; muda quando algum romaneio é gravado"""
+        from queries.rollups import TABELA_RESUMO
 
+        with timed("metadados_tabelas"):
+            fingerprint = {nome: self.backend.table_metadata(table_id) for nome, table_id in TABELAS.items()}
+            if self.backend.table_exists(TABELA_RESUMO):
+                # o resumo pode ser recriado (--rebuild) sem mudar as tabelas brutas
+                fingerprint["resumo"] = self.backend.table_metadata(TABELA_RESUMO)
+        # tabela alterada: os resultados guardados no cache de queries deixam de valer
+        self.executor.observe_fingerprint(fingerprint)
+        return fingerprint
 
+    def get_resumo(self, rota: str | None = None, desde=None):
+        """Resumo diário (uma linha por dia e rota); None se ainda não existir"""
+        from queries.rollups import read_rollup
 
+        return read_rollup(self.executor, rota, desde)
@@ -0,0 +1,82 @@
+import logging
+import threading
+
+from database.db_connection import get_setting
+from queries.data_store import SharedDataStore
+from queries.get_data import BusinessData
+
+
+logger = logging.getLogger("dashboard.refresher")
+
+# Intervalo padrão entre verificações (segundos); 0 desliga o refresher
+REFRESH_INTERVAL_PADRAO = 300
+
+
+class DataRefresher:
+    """Verifica periodicamente se as tabelas mudaram e atualiza o data store.
+
+    Cada verificação lê só metadados (num_rows/modified da tabela no
+    BigQuery, COUNT/MAX(CREATED_AT) no backend local); a carga, incremental
+    sempre que possível, só acontece quando algo mudou. O frescor dos dados
+    fica limitado ao intervalo configurado.
+    """
+
+    def __init__(self, store: SharedDataStore, interval: float, business_data: BusinessData | None = None):
+        self.store = store
+        self.interval = interval
+        self._business_data = business_data
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def business_data(self) -> BusinessData:
+        if self._business_data is None:
+            self._business_data = BusinessData()
+        return self._business_data
+
+    def check_once(self) -> bool:
+        """Atualiza se os metadados mudaram; retorna True se publicou uma nova versão"""
+        atual = self.store.get()
+        if atual.fingerprint is not None and self.business_data.fingerprint() == atual.fingerprint:
+            return False
+
+        snapshot = self.store.refresh_incremental(self.business_data)
+        logger.info(f"mudança detectada; dados atualizados para a versão {snapshot.version}")
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check_once()
+            except Exception:
+                # falha pontual (rede, permissão...): mantém a versão atual e tenta de novo no próximo ciclo
+                logger.exception("falha ao verificar atualizações")
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="data-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+_refresher: DataRefresher | None = None
+_refresher_lock = threading.Lock()
+
+
+def start_refresher(store: SharedDataStore) -> DataRefresher | None:
+    """Inicia (uma vez por processo) o refresher com REFRESH_INTERVAL_SECONDS"""
+    global _refresher
+
+    interval = float(get_setting("REFRESH_INTERVAL_SECONDS", str(REFRESH_INTERVAL_PADRAO)))
+    if interval <= 0:
+        return None
+
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = DataRefresher(store, interval)
+            _refresher.start()
+    return _refresher
@@ -0,0 +1,222 @@
+"""Médias móveis, crescimento mensal e margem acumulada mantidos por versão.
+
+O estado é uma série por dia de calendário (receita, despesas, romaneios)
+com as somas acumuladas, guardada em blocos imutáveis de BLOCO dias. Uma
+versão nova criada pela carga incremental reaproveita os blocos anteriores
+ao primeiro dia alterado e só recalcula daí em diante, então o custo é
+proporcional às linhas novas (e aos dias desde a mais antiga delas), não ao
+histórico. As consultas usam as somas acumuladas: média de N dias, total do
+mês (ou do mês até hoje) e margem desde o início do período saem em O(1) por
+ponto.
+"""
+import numpy as np
+import pandas as pd
+
+
+# dias por bloco; só o último bloco de uma versão fica incompleto
+BLOCO = 256
+
+# colunas da matriz de cada bloco
+RECEITA, DESPESAS, ROMANEIOS, CUM_RECEITA, CUM_DESPESAS, CUM_DIAS = range(6)
+
+JANELAS = (7, 30)
+
+
+def daily_delta(receitas: pd.DataFrame | None = None, despesas: pd.DataFrame | None = None, sinal: int = 1) -> pd.DataFrame:
+    """Totais por dia (RECEITA, DESPESAS, ROMANEIOS) das linhas dadas, multiplicados por `sinal`"""
+    partes = []
+    if receitas is not None and not receitas.empty:
+        partes.append(pd.DataFrame({
+            "DATA": pd.to_datetime(receitas["DATA"]).dt.normalize(),
+            "RECEITA": receitas["VALOR_TOTAL"].astype(float),
+            "ROMANEIOS": 1.0,
+        }))
+    if despesas is not None and not despesas.empty:
+        partes.append(pd.DataFrame({
+            "DATA": pd.to_datetime(despesas["DATA"]).dt.normalize(),
+            "DESPESAS": despesas["VALOR"].astype(float),
+        }))
+
+    if not partes:
+        return pd.DataFrame(columns=["RECEITA", "DESPESAS", "ROMANEIOS"], index=pd.DatetimeIndex([], name="DATA"))
+
+    linhas = pd.concat(partes, ignore_index=True).dropna(subset=["DATA"]).fillna(0.0)
+    for coluna in ("RECEITA", "DESPESAS", "ROMANEIOS"):
+        if coluna not in linhas.columns:
+            linhas[coluna] = 0.0
+    return linhas.groupby("DATA")[["RECEITA", "DESPESAS", "ROMANEIOS"]].sum() * sinal
+
+
+class RollingMetrics:
+    """Série diária acumulada de uma versão dos dados (imutável).
+
+    `inicio` é o primeiro dia; o dia i fica na linha i % BLOCO do bloco
+    i // BLOCO. Versões diferentes compartilham os blocos que não mudaram.
+    """
+
+    def __init__(self, inicio: pd.Timestamp | None = None, blocos: tuple = (), n: int = 0):
+        self.inicio = inicio
+        self.blocos = blocos
+        self.n = n
+
+    def __len__(self) -> int:
+        return self.n
+
+    # ---- construção -----------------------------------------------------
+    @classmethod
+    def from_frames(cls, receitas: pd.DataFrame, despesas: pd.DataFrame) -> "RollingMetrics":
+        """Cálculo completo a partir das tabelas (primeira carga ou fallback)"""
+        return cls().apply_delta(daily_delta(receitas, despesas))
+
+    def apply_delta(self, delta: pd.DataFrame) -> "RollingMetrics":
+        """Nova versão somando `delta` (ver daily_delta) aos dias correspondentes.
+
+        Blocos anteriores ao primeiro dia afetado são compartilhados com esta
+        versão; o restante é recalculado. Um dia anterior ao início da série
+        refaz tudo.
+        """
+        delta = delta[(delta != 0).any(axis=1)]
+        if delta.empty:
+            return self
+
+        primeiro, ultimo = delta.index.min(), delta.index.max()
+        if self.inicio is None or primeiro < self.inicio:
+            base = self._dense(0, self.n)
+            inicio = primeiro if self.inicio is None else min(primeiro, self.inicio)
+            deslocamento = 0 if self.inicio is None else (self.inicio - inicio).days
+            return self._rebuild(inicio, (), 0, base, deslocamento, delta)
+
+        j = (primeiro - self.inicio).days
+        # reescreve a partir do início do bloco de j; blocos anteriores ficam como estão
+        bloco_j = min(j, self.n) // BLOCO
+        s = bloco_j * BLOCO
+        return self._rebuild(self.inicio, self.blocos[:bloco_j], s, self._dense(s, self.n), 0, delta, ultimo)
+
+    def _rebuild(self, inicio, blocos, s, existentes, deslocamento, delta, ultimo=None) -> "RollingMetrics":
+        ultimo = delta.index.max() if ultimo is None else ultimo
+        n = max(self.n + deslocamento, (ultimo - inicio).days + 1)
+
+        valores = np.zeros((n - s, 3))
+        valores[deslocamento:deslocamento + len(existentes)] = existentes[:, :3]
+        posicoes = (delta.index - inicio).days.to_numpy() - s
+        np.add.at(valores, posicoes, delta[["RECEITA", "DESPESAS", "ROMANEIOS"]].to_numpy(dtype=float))
+
+        # somas acumuladas continuam a partir da última linha mantida
+        anteriores = blocos[-1][-1, CUM_RECEITA:] if blocos else np.zeros(3)
+        cumulativos = np.cumsum(
+            np.column_stack([valores[:, 0], valores[:, 1], (valores[:, 2] > 0).astype(float)]), axis=0
+        ) + anteriores
+
+        matriz = np.hstack([valores, cumulativos])
+        matriz.setflags(write=False)
+        novos = tuple(matriz[i:i + BLOCO] for i in range(0, len(matriz), BLOCO))
+        return RollingMetrics(inicio, tuple(blocos) + novos, n)
+
+    def _dense(self, a: int, b: int) -> np.ndarray:
+        """Linhas [a, b) da série, juntando os blocos envolvidos"""
+        a, b = max(a, 0), min(b, self.n)
+        if a >= b:
+            return np.zeros((0, 6))
+        partes = [self.blocos[i] for i in range(a // BLOCO, (b - 1) // BLOCO + 1)]
+        inicio_bloco = (a // BLOCO) * BLOCO
+        return np.concatenate(partes)[a - inicio_bloco:b - inicio_bloco]
+
+    # ---- consulta -------------------------------------------------------
+    def series(self, desde=None) -> pd.DataFrame:
+        """Por dia desde `desde`: valores, médias móveis (por dia com romaneio) e margem acumulada.
+
+        As janelas olham para antes de `desde`, então a média do primeiro
+        dia do período já considera os 30 dias anteriores.
+        """
+        colunas = ["DATA", "RECEITA", "DESPESAS"] + [
+            f"MA{janela}_{nome}" for janela in JANELAS for nome in ("RECEITA", "DESPESAS")
+        ] + ["MARGEM_ACUMULADA"]
+        if self.n == 0:
+            return pd.DataFrame(columns=colunas)
+
+        a = 0 if desde is None or pd.isna(desde) else max(0, (pd.Timestamp(desde).ceil("D") - self.inicio).days)
+        a = min(a, self.n)
+        maior = max(JANELAS)
+        # linhas dos índices a-maior-1 .. n-1; antes do primeiro dia as somas acumuladas são zero
+        lo = a - maior - 1
+        linhas = np.vstack([np.zeros((max(0, -lo), 6)), self._dense(lo, self.n)])
+        desloc = maior + 1
+        atual = linhas[desloc:]
+
+        resultado = {
+            "DATA": pd.date_range(self.inicio + pd.Timedelta(days=a), periods=len(atual), freq="D"),
+            "RECEITA": atual[:, RECEITA],
+            "DESPESAS": atual[:, DESPESAS],
+        }
+        for janela in JANELAS:
+            anterior = linhas[desloc - janela:len(linhas) - janela]
+            dias = atual[:, CUM_DIAS] - anterior[:, CUM_DIAS]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                for coluna, nome in ((CUM_RECEITA, "RECEITA"), (CUM_DESPESAS, "DESPESAS")):
+                    resultado[f"MA{janela}_{nome}"] = np.where(dias > 0, (atual[:, coluna] - anterior[:, coluna]) / dias, np.nan)
+
+        base = linhas[desloc - 1]
+        receita = atual[:, CUM_RECEITA] - base[CUM_RECEITA]
+        despesas = atual[:, CUM_DESPESAS] - base[CUM_DESPESAS]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            resultado["MARGEM_ACUMULADA"] = np.where(receita > 0, (receita - despesas) / receita * 100, np.nan)
+
+        return pd.DataFrame(resultado)[colunas]
+
+    def monthly_growth(self) -> pd.DataFrame:
+        """Totais por mês e crescimento (%) sobre o mês anterior"""
+        if self.n == 0:
+            return pd.DataFrame(columns=["MES", "RECEITA", "DESPESAS", "CRESC_RECEITA", "CRESC_DESPESAS"])
+
+        meses = pd.period_range(self.inicio, self.inicio + pd.Timedelta(days=self.n - 1), freq="M")
+        # último dia de cada mês dentro da série -> soma acumulada naquele dia
+        fins = np.minimum(((meses.end_time.normalize() - self.inicio).days).to_numpy(), self.n - 1)
+        cumulativos = np.vstack([self.blocos[i // BLOCO][i % BLOCO, CUM_RECEITA:CUM_DIAS] for i in fins])
+        totais = np.diff(np.vstack([np.zeros(2), cumulativos]), axis=0)
+
+        resultado = pd.DataFrame({"MES": meses.start_time, "RECEITA": totais[:, 0], "DESPESAS": totais[:, 1]})
+        for nome in ("RECEITA", "DESPESAS"):
+            anterior = resultado[nome].shift(1)
+            resultado[f"CRESC_{nome}"] = (resultado[nome] - anterior) / anterior.where(anterior > 0) * 100
+        return resultado
+
+    def month_to_date(self, hoje=None) -> dict | None:
+        """Último mês com dados comparado com os mesmos dias do mês anterior.
+
+        No mês corrente (parcial), soma do dia 1 até `hoje` e compara com os
+        dias 1..dia de hoje do mês anterior, em vez do mês anterior inteiro;
+        um mês já encerrado é comparado inteiro com o anterior inteiro.
+        """
+        if self.n == 0:
+            return None
+
+        hoje = pd.Timestamp.now().normalize() if hoje is None else pd.Timestamp(hoje).normalize()
+        mes = (self.inicio + pd.Timedelta(days=self.n - 1)).to_period("M")
+        anterior = mes - 1
+
+        parcial = hoje.to_period("M") == mes
+        if parcial:
+            dias = hoje.day
+            fim = hoje
+            fim_anterior = anterior.start_time + pd.Timedelta(days=min(dias, anterior.days_in_month) - 1)
+        else:
+            dias = mes.days_in_month
+            fim = mes.end_time.normalize()
+            fim_anterior = anterior.end_time.normalize()
+
+        atual = self._acumulado(fim) - self._acumulado(mes.start_time - pd.Timedelta(days=1))
+        base = self._acumulado(fim_anterior) - self._acumulado(anterior.start_time - pd.Timedelta(days=1))
+
+        resultado = {"MES": mes.start_time, "DIAS": dias, "PARCIAL": parcial}
+        for i, nome in enumerate(("RECEITA", "DESPESAS")):
+            resultado[nome] = float(atual[i])
+            resultado[f"ANTERIOR_{nome}"] = float(base[i])
+            resultado[f"CRESC_{nome}"] = (atual[i] - base[i]) / base[i] * 100 if base[i] > 0 else np.nan
+        return resultado
+
+    def _acumulado(self, dia) -> np.ndarray:
+        """(receita, despesas) acumuladas até `dia`, inclusive; zero antes do início da série"""
+        i = min((pd.Timestamp(dia) - self.inicio).days, self.n - 1)
+        if i < 0:
+            return np.zeros(2)
+        return self.blocos[i // BLOCO][i % BLOCO, CUM_RECEITA:CUM_DIAS]
@@ -0,0 +1,247 @@
+"""Resumo diário mantido na gravação.
+
+Cada ingestão soma o delta de RECEITAS/DESPESAS/PESO_NOTAS nos dias
+afetados com um único MERGE no BigQuery (upsert no SQLite), então o resumo
+tem uma linha por dia e rota e a leitura custa proporcional ao número de
+dias, não ao número de romaneios. Os totais da frota saem da soma das
+linhas de cada rota no dia (combine_routes); semanas e meses dos gráficos
+longos são agrupados a partir dos dias (frontend/time_buckets.py).
+
+Para montar os resumos a partir das tabelas brutas já existentes:
+
+    python -m queries.rollups --rebuild        (a partir de src/)
+"""
+import argparse
+import logging
+from datetime import datetime
+
+import pandas as pd
+
+from queries.romaneio import ROTA_PADRAO, rota_column
+
+
+logger = logging.getLogger("dashboard.rollups")
+
+
+DATASET = "SBOX_ISRAEL"
+
+TABELA_RESUMO = f"{DATASET}.RESUMO_DIARIO"
+
+# categorias reconhecidas por ProcessRomaneio.set_despesas
+CATEGORIAS = {
+    "Pedágio": "DESP_PEDAGIO",
+    "Café": "DESP_CAFE",
+    "Almoço": "DESP_ALMOCO",
+    "Abastecimento": "DESP_ABASTECIMENTO",
+}
+DESP_OUTRAS = "DESP_OUTRAS"
+
+# chave de cada linha dos resumos
+CHAVES = ["BUCKET", "ROTA"]
+
+COLUNAS_CONTAGEM = ["N_ROMANEIOS", "TOTAL_NOTAS", "NOTAS_REALIZADAS", "NOTAS_LEVES", "NOTAS_PESADAS"]
+
+COLUNAS_SOMA = [
+    "N_ROMANEIOS",
+    "RECEITA",
+    "DESPESAS",
+    "LUCRO",
+    "TOTAL_NOTAS",
+    "NOTAS_REALIZADAS",
+    "NOTAS_LEVES",
+    "NOTAS_PESADAS",
+    "FAT_NOTA_LEVE",
+    "FAT_NOTA_PESADA",
+    *CATEGORIAS.values(),
+    DESP_OUTRAS,
+]
+
+
+def _delta_receitas(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        "DATA": df["DATA"],
+        "ROTA": rota_column(df),
+        "N_ROMANEIOS": 1,
+        "RECEITA": df["VALOR_TOTAL"],
+        "LUCRO": df["VALOR_TOTAL"],
+        "TOTAL_NOTAS": df["TOTAL_NOTAS"],
+        "NOTAS_REALIZADAS": df["NOTAS_REALIZADAS"],
+    })
+
+
+def _delta_despesas(df: pd.DataFrame) -> pd.DataFrame:
+    delta = pd.DataFrame({
+        "DATA": df["DATA"],
+        "ROTA": rota_column(df),
+        "DESPESAS": df["VALOR"],
+        "LUCRO": -df["VALOR"],
+    })
+    coluna_categoria = df["CATEGORIA"].map(CATEGORIAS).fillna(DESP_OUTRAS)
+    for coluna in [*CATEGORIAS.values(), DESP_OUTRAS]:
+        delta[coluna] = df["VALOR"].where(coluna_categoria == coluna, 0.0)
+    return delta
+
+
+def _delta_peso_notas(df: pd.DataFrame) -> pd.DataFrame:
+    return df[["DATA", "NOTAS_LEVES", "NOTAS_PESADAS", "FAT_NOTA_LEVE", "FAT_NOTA_PESADA"]].assign(ROTA=rota_column(df))
+
+
+DELTAS = {
+    f"{DATASET}.RECEITAS": _delta_receitas,
+    f"{DATASET}.DESPESAS": _delta_despesas,
+    f"{DATASET}.PESO_NOTAS": _delta_peso_notas,
+}
+
+
+def build_rollup(delta: pd.DataFrame) -> pd.DataFrame:
+    """Agrupa um delta (uma linha por registro, com DATA e ROTA) por dia e rota"""
+    delta = delta.copy()
+    delta["DATA"] = pd.to_datetime(delta["DATA"])
+    delta["ROTA"] = rota_column(delta)
+    for coluna in COLUNAS_SOMA:
+        if coluna not in delta.columns:
+            delta[coluna] = 0
+    delta[COLUNAS_SOMA] = delta[COLUNAS_SOMA].fillna(0).astype(float)
+    # contagens como inteiro e valores como float, para o schema ser o mesmo em toda gravação
+    delta[COLUNAS_CONTAGEM] = delta[COLUNAS_CONTAGEM].astype(int)
+
+    bucket = delta["DATA"].dt.normalize().rename("BUCKET")
+    resumo = delta.groupby([bucket, delta["ROTA"]])[COLUNAS_SOMA].sum().reset_index()
+    # CREATED_AT: última gravação que tocou o bucket (usado pelo refresher)
+    resumo["CREATED_AT"] = pd.Timestamp(datetime.now().strftime("%Y-%m-%d"))
+    return resumo
+
+
+def update_rollups_batch(backend, frames: dict[str, pd.DataFrame]) -> None:
+    """Soma no resumo diário o que acabou de ser gravado ({table_id: df}) com um único MERGE.
+
+    Tabelas que não entram no resumo são ignoradas. No BigQuery são uma
+    carga de staging e um MERGE por ingestão, não por tabela.
+    """
+    deltas = [DELTAS[table_id](df) for table_id, df in frames.items() if table_id in DELTAS and not df.empty]
+    if not deltas:
+        return
+
+    backend.merge_sum(build_rollup(pd.concat(deltas, ignore_index=True)), TABELA_RESUMO, chaves=CHAVES, soma=COLUNAS_SOMA)
+
+
+def update_rollups(backend, df: pd.DataFrame, table_id: str) -> None:
+    """Soma no resumo o que acabou de ser gravado em table_id (no-op para outras tabelas)"""
+    update_rollups_batch(backend, {table_id: df})
+
+
+def ensure_rollup_schema(backend) -> bool:
+    """Recria o resumo criado antes da coluna ROTA (chave só BUCKET); True se recriou.
+
+    Roda antes do append nas tabelas brutas: com a gravação bruta já feita,
+    o MERGE por (BUCKET, ROTA) falharia e deixaria bruto e resumo
+    divergentes, e recriar depois dela contaria o delta duas vezes.
+    """
+    if not backend.table_exists(TABELA_RESUMO) or "ROTA" in backend.table_columns(TABELA_RESUMO):
+        return False
+
+    logger.warning(f"{TABELA_RESUMO} sem a coluna ROTA; recriando a partir das tabelas brutas")
+    rebuild_rollups(backend)
+    return True
+
+
+def rebuild_rollups(backend) -> int:
+    """Recria o resumo diário do zero a partir das tabelas brutas; retorna o número de buckets"""
+    deltas = []
+    for table_id, funcao in DELTAS.items():
+        df = backend.query(f"SELECT * FROM {table_id}", nome=f"rebuild:{table_id}")
+        if not df.empty:
+            deltas.append(funcao(df))
+
+    if not deltas:
+        return 0
+
+    resumo = build_rollup(pd.concat(deltas, ignore_index=True))
+    backend.replace_df(resumo, TABELA_RESUMO)
+    return len(resumo)
+
+
+def read_rollup(backend, rota: str | None = None, desde=None) -> pd.DataFrame | None:
+    """Lê o resumo diário (só as linhas da rota, se informada); None se a tabela ainda não existe.
+
+    `desde` traz só as linhas com CREATED_AT a partir da data (buckets
+    tocados por gravações desde então, ver load_incremental).
+    """
+    if not backend.table_exists(TABELA_RESUMO):
+        return None
+
+    condicoes, params = [], {}
+    if rota is not None:
+        if "ROTA" in backend.table_columns(TABELA_RESUMO):
+            # linhas sem ROTA (anteriores à coluna) são da rota padrão, como em BusinessData._get_table
+            condicoes.append("COALESCE(ROTA, @rota_padrao) = @rota")
+            params.update(rota=rota, rota_padrao=ROTA_PADRAO)
+        elif rota != ROTA_PADRAO:
+            # resumo anterior à coluna ROTA: tudo é da rota padrão
+            condicoes.append("1 = 0")
+    if desde is not None:
+        condicoes.append("CAST(CREATED_AT AS DATE) >= @desde")
+        params["desde"] = pd.Timestamp(desde).normalize()
+
+    query = f"SELECT * FROM {TABELA_RESUMO}"
+    if condicoes:
+        query += " WHERE " + " AND ".join(condicoes)
+    df = backend.query(query, params or None, nome="resumo_diario")
+    df["BUCKET"] = pd.to_datetime(df["BUCKET"])
+    df["CREATED_AT"] = pd.to_datetime(df["CREATED_AT"])
+    # resumos criados antes da coluna ROTA (recriar com --rebuild para separar as rotas)
+    df["ROTA"] = rota_column(df)
+    return df.sort_values(CHAVES, ignore_index=True)
+
+
+def combine_routes(resumo: pd.DataFrame) -> pd.DataFrame:
+    """Totais da frota: uma linha por bucket com a soma das linhas de todas as rotas"""
+    return resumo.groupby("BUCKET", as_index=False)[COLUNAS_SOMA].sum()
+
+
+def rollup_to_frames(resumo: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Converte o resumo diário para o formato de RECEITAS, DESPESAS e PESO_NOTAS.
+
+    Com um romaneio por dia e rota, o resultado tem os mesmos valores que
+    as tabelas brutas para tudo o que o dashboard agrega (totais, médias
+    por dia, por categoria e por dia da semana). A coluna ROTA é mantida
+    quando o resumo a tem (resumo por rota, não combinado).
+    """
+    chaves = ["DATA", "ROTA"] if "ROTA" in resumo.columns else ["DATA"]
+    dias = resumo[resumo["N_ROMANEIOS"] > 0].rename(columns={"BUCKET": "DATA"})
+
+    receitas = dias[[*chaves, "TOTAL_NOTAS", "NOTAS_REALIZADAS", "RECEITA"]].rename(columns={"RECEITA": "VALOR_TOTAL"})
+    peso_notas = dias[[*chaves, "NOTAS_LEVES", "NOTAS_PESADAS", "FAT_NOTA_LEVE", "FAT_NOTA_PESADA"]]
+
+    nomes = {coluna: categoria for categoria, coluna in CATEGORIAS.items()}
+    nomes[DESP_OUTRAS] = "Outras"
+    despesas = (
+        resumo.rename(columns={"BUCKET": "DATA"})
+        .melt(id_vars=chaves, value_vars=list(nomes), var_name="CATEGORIA", value_name="VALOR")
+    )
+    despesas = (
+        despesas[despesas["VALOR"] != 0]
+        .assign(CATEGORIA=lambda df: df["CATEGORIA"].map(nomes))
+        .sort_values("DATA", ignore_index=True)
+    )
+
+    return receitas.reset_index(drop=True), despesas, peso_notas.reset_index(drop=True)
+
+
+def main() -> int:
+    from database.db_connection import get_data_backend
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="recria os resumos a partir das tabelas brutas")
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.print_help()
+        return 1
+
+    print(f"{TABELA_RESUMO}: {rebuild_rollups(get_data_backend())} buckets")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,12 +5,15 @@ import re
 import pandas as pd
 from datetime import datetime
 
-from google.cloud import bigquery
+
+# rota dos romaneios sem rota informada (e das linhas gravadas antes da coluna ROTA)
+ROTA_PADRAO = "PRINCIPAL"
 
 
 @dataclass
 class RomaneioData:
     data: Optional[str] = None
+    rota: str = ROTA_PADRAO
     total_notas: Optional[int] = None
     realizadas: Optional[int] = None
     notas_leves: Optional[int] = None
@@ -19,13 +22,16 @@ class RomaneioData:
     fat_notas_pesadas: Optional[float] = None
     valor_total: Optional[float] = None
     ceps: Optional[str] = None
+    cep_inicio: Optional[int] = None
+    cep_fim: Optional[int] = None
     despesas: dict[str, float] = field(default_factory=dict)
 
 
 class ProcessRomaneio:
-    def __init__(self, input_text: str, year: int | None = None):
+    def __init__(self, input_text: str, year: int | None = None, rota: str | None = None):
         self.input_text = input_text
         self.year = year
+        self.rota = rota
         self.result = RomaneioData()
 
     def _notas_regex(self):
@@ -43,6 +49,15 @@ class ProcessRomaneio:
 
         self.result.data = data
 
+    def set_rota(self) -> None:
+        # rota/motorista informada na chamada ou numa linha "Rota ..." do romaneio
+        rota = self.rota
+        if not rota:
+            match = re.search(r"^\s*Rota\s*:?\s+(.+?)\s*$", self.input_text, re.IGNORECASE | re.MULTILINE)
+            rota = match.group(1) if match else ROTA_PADRAO
+
+        self.result.rota = rota.strip().upper()
+
     def set_notas_geral(self):
         total_notas = int(re.search(r"Total de notas\s+(\d+)", self.input_text).group(1))
         realizadas = int(re.search(r"Realizadas\s+(\d+)", self.input_text).group(1))
@@ -95,12 +110,17 @@ class ProcessRomaneio:
             self.result.ceps = ""
             return
 
-        cep_start, cep_end = map(int, match.groups())
+        # "Ceps 034 ao 030": a faixa é a mesma, guardada sempre em ordem crescente
+        cep_start, cep_end = sorted(map(int, match.groups()))
 
-        self.result.ceps = ", ".join(str(c) for c in range(cep_start, cep_end + 1))
+        # faixa compacta (tamanho fixo, mantém os zeros à esquerda) + inteiros para o índice de CEPs
+        self.result.ceps = f"{cep_start:03d}-{cep_end:03d}"
+        self.result.cep_inicio = cep_start
+        self.result.cep_fim = cep_end
 
     def process(self) -> RomaneioData:
         self.set_data()
+        self.set_rota()
         self.set_ceps()
         self.set_notas_geral()
         self.set_notas_por_peso()
@@ -118,10 +138,13 @@ class BuildDataFrames:
     def build_df_receitas(self) -> pd.DataFrame:
         data = {
             "DATA": [self.romaneio_data.data],
+            "ROTA": [self.romaneio_data.rota],
             "TOTAL_NOTAS": [self.romaneio_data.total_notas],
             "NOTAS_REALIZADAS": [self.romaneio_data.realizadas],
             "VALOR_TOTAL": [self.romaneio_data.valor_total],
             "CEPS": [self.romaneio_data.ceps],
+            "CEP_INICIO": [self.romaneio_data.cep_inicio],
+            "CEP_FIM": [self.romaneio_data.cep_fim],
             "CREATED_AT": [datetime.now().strftime("%Y-%m-%d")]
         }
         df_receitas = pd.DataFrame(data)
@@ -131,6 +154,7 @@ class BuildDataFrames:
         despesas = self.romaneio_data.despesas
         data = {
             "DATA": [self.romaneio_data.data] * len(despesas),
+            "ROTA": [self.romaneio_data.rota] * len(despesas),
             "CATEGORIA": list(despesas.keys()),
             "VALOR": list(despesas.values()),
             "CREATED_AT": [datetime.now().strftime("%Y-%m-%d")] * len(despesas)
@@ -141,6 +165,7 @@ class BuildDataFrames:
     def build_df_peso_notas(self) -> pd.DataFrame:
         data = {
             "DATA": [self.romaneio_data.data],
+            "ROTA": [self.romaneio_data.rota],
             "NOTAS_LEVES": [self.romaneio_data.notas_leves],
             "NOTAS_PESADAS": [self.romaneio_data.notas_pesadas],
             "FAT_NOTA_LEVE": [self.romaneio_data.fat_notas_leves],
@@ -151,6 +176,13 @@ class BuildDataFrames:
         return df_peso_notas
     
 
+def rota_column(df: pd.DataFrame) -> pd.Series:
+    """ROTA de cada linha, com ROTA_PADRAO nas linhas (ou tabelas) gravadas antes da coluna existir"""
+    if "ROTA" not in df.columns:
+        return pd.Series(ROTA_PADRAO, index=df.index, dtype=object)
+    return df["ROTA"].fillna(ROTA_PADRAO)
+
+
 def convert_types(df:pd.DataFrame, lista_datas: list) -> pd.DataFrame:
     for coluna in df.columns:
         if coluna in lista_datas:
@@ -159,22 +191,43 @@ def convert_types(df:pd.DataFrame, lista_datas: list) -> pd.DataFrame:
             df[coluna] = df[coluna].astype(float)
         elif coluna.startswith("NOTAS") or coluna == "TOTAL_NOTAS" or coluna == "NOTAS_REALIZADAS":
             df[coluna] = df[coluna].astype(int)
+        elif coluna.startswith("CEP_"):
+            # romaneio sem faixa de CEPs fica nulo
+            df[coluna] = df[coluna].astype("Int64")
     return df
 
 
 def append_df_to_bq(
-    client: bigquery.Client,
+    client,
     df,
     table_id: str,
+    atualizar_resumos: bool = True,
 ):
-    job_config = bigquery.LoadJobConfig(
-        write_disposition=bigquery.WriteDisposition.WRITE_APPEND
-    )
-
-    job = client.load_table_from_dataframe(
-        df,
-        table_id,
-        job_config=job_config,
-    )
-
-    job.result()  # aguarda finalizar
\ No newline at end of file
+    """Acrescenta df em table_id e soma o delta nas tabelas de resumo.
+
+    `client` pode ser um bigquery.Client (uso original no ingestao.ipynb) ou
+    qualquer DataBackend de database.backends (ex.: o SQLiteBackend local).
+    Se a atualização dos resumos falhar depois do append, eles podem ser
+    recriados com `python -m queries.rollups --rebuild`.
+    """
+    append_dfs_to_bq(client, {table_id: df}, atualizar_resumos)
+
+
+def append_dfs_to_bq(client, frames: dict, atualizar_resumos: bool = True):
+    """Acrescenta cada df ({table_id: df}) na sua tabela e atualiza o resumo uma vez só.
+
+    Preferível a três append_df_to_bq para um romaneio: o resumo recebe os
+    deltas de RECEITAS, DESPESAS e PESO_NOTAS juntos, num único MERGE.
+    """
+    from database.backends import BigQueryBackend, DataBackend
+    from queries.rollups import ensure_rollup_schema, update_rollups_batch
+
+    backend = client if isinstance(client, DataBackend) else BigQueryBackend(client)
+    if atualizar_resumos:
+        # antes do append: um resumo sem ROTA é recriado só com o que já estava gravado
+        ensure_rollup_schema(backend)
+    for table_id, df in frames.items():
+        backend.append_df(df, table_id)
+
+    if atualizar_resumos:
+        update_rollups_batch(backend, frames)
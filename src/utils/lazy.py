@@ -0,0 +1,53 @@
+import importlib
+import sys
+import threading
+
+
+class _LazyModule:
+    """Representa o módulo `nome` até o primeiro acesso a um atributo, quando ele é importado.
+
+    O import acontece sob um lock: sessões do Streamlit rodam em threads
+    paralelas e não podem ver o módulo pela metade (o LazyLoader do
+    importlib não é seguro entre threads no Python 3.12.1).
+    """
+
+    def __init__(self, nome: str):
+        self.__dict__["_nome"] = nome
+        self.__dict__["_modulo"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _carregar(self):
+        modulo = self.__dict__["_modulo"]
+        if modulo is None:
+            with self.__dict__["_lock"]:
+                modulo = self.__dict__["_modulo"]
+                if modulo is None:
+                    # import_module também define o módulo como atributo do pacote pai
+                    modulo = importlib.import_module(self.__dict__["_nome"])
+                    self.__dict__["_modulo"] = modulo
+        return modulo
+
+    def __getattr__(self, atributo):
+        return getattr(self._carregar(), atributo)
+
+    def __setattr__(self, atributo, valor):
+        setattr(self._carregar(), atributo, valor)
+
+    def __dir__(self):
+        return dir(self._carregar())
+
+    def __repr__(self):
+        estado = "carregado" if self.__dict__["_modulo"] is not None else "não carregado"
+        return f"<módulo preguiçoso {self.__dict__['_nome']!r} ({estado})>"
+
+
+def lazy_import(nome: str):
+    """Retorna o módulo `nome` carregado só no primeiro acesso a um atributo.
+
+    Usado para tirar pandas/plotly do caminho de inicialização do app: o
+    import só acontece quando algum gráfico ou dado é realmente usado.
+    Nada é importado (nem o pacote pai) até esse primeiro acesso.
+    """
+    if nome in sys.modules:
+        return sys.modules[nome]
+    return _LazyModule(nome)
@@ -0,0 +1,9 @@
+import pytest
+
+from database.backends import SQLiteBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    """Backend local vazio num diretório temporário"""
+    return SQLiteBackend(str(tmp_path / "db"))
@@ -0,0 +1,41 @@
+import pandas as pd
+
+
+TABELA = "SBOX_ISRAEL.RESUMO_TESTE"
+
+
+def _linhas(backend):
+    return backend.query(f"SELECT * FROM {TABELA}").sort_values(["BUCKET", "ROTA"], ignore_index=True)
+
+
+def test_merge_sum_cria_tabela_e_soma(backend):
+    primeiro = pd.DataFrame({"BUCKET": ["2026-01-01", "2026-01-02"], "ROTA": "A", "RECEITA": [10.0, 20.0], "OBS": ["x", "y"]})
+    segundo = pd.DataFrame({"BUCKET": ["2026-01-02", "2026-01-03"], "ROTA": "A", "RECEITA": [5.0, 7.0], "OBS": ["z", "w"]})
+
+    backend.merge_sum(primeiro, TABELA, chaves=["BUCKET", "ROTA"], soma=["RECEITA"])
+    backend.merge_sum(segundo, TABELA, chaves=["BUCKET", "ROTA"], soma=["RECEITA"])
+
+    linhas = _linhas(backend)
+    assert linhas["RECEITA"].tolist() == [10.0, 25.0, 7.0]
+    # colunas fora de `soma` ficam com o último valor gravado
+    assert linhas["OBS"].tolist() == ["x", "z", "w"]
+
+
+def test_merge_sum_separa_rotas(backend):
+    df = pd.DataFrame({"BUCKET": ["2026-01-01"] * 2, "ROTA": ["A", "B"], "RECEITA": [1.0, 2.0]})
+
+    backend.merge_sum(df, TABELA, chaves=["BUCKET", "ROTA"], soma=["RECEITA"])
+    backend.merge_sum(df, TABELA, chaves=["BUCKET", "ROTA"], soma=["RECEITA"])
+
+    assert _linhas(backend)["RECEITA"].tolist() == [2.0, 4.0]
+
+
+def test_merge_sum_troca_indice_de_chave_antiga(backend):
+    # tabela com índice único só em BUCKET (resumo anterior à coluna ROTA)
+    antigo = pd.DataFrame({"BUCKET": ["2026-01-01"], "ROTA": ["A"], "RECEITA": [1.0]})
+    backend.merge_sum(antigo, TABELA, chaves=["BUCKET"], soma=["RECEITA"])
+
+    novo = pd.DataFrame({"BUCKET": ["2026-01-01"] * 2, "ROTA": ["A", "B"], "RECEITA": [1.0, 2.0]})
+    backend.merge_sum(novo, TABELA, chaves=["BUCKET", "ROTA"], soma=["RECEITA"])
+
+    assert _linhas(backend)["RECEITA"].tolist() == [2.0, 2.0]
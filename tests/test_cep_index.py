@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from queries.cep_index import CepCoverageIndex, cep_ranges, parse_ceps
+from queries.romaneio import ProcessRomaneio
+from synthetic_data import SCALES, generate_romaneio_texts, generate_tables
+
+
+def _receitas(*faixas):
+    return pd.DataFrame({
+        "DATA": pd.date_range("2026-01-01", periods=len(faixas)),
+        "VALOR_TOTAL": [100.0] * len(faixas),
+        "CEP_INICIO": [inicio for inicio, _ in faixas],
+        "CEP_FIM": [fim for _, fim in faixas],
+    })
+
+
+def test_set_ceps_ordena_faixa_invertida():
+    texto, ano = generate_romaneio_texts(1)[0]
+    texto = texto.replace(texto[texto.index("Ceps"):], "Ceps 034 ao 030.\n")
+
+    dados = ProcessRomaneio(texto, year=ano).process()
+
+    assert (dados.cep_inicio, dados.cep_fim) == (30, 34)
+    assert dados.ceps == "030-034"
+
+
+def test_cep_ranges_desinverte_linhas_gravadas():
+    faixas = cep_ranges(_receitas((34, 30), (10, 12)))
+
+    assert faixas[["CEP_INICIO", "CEP_FIM"]].values.tolist() == [[30, 34], [10, 12]]
+
+
+def test_indice_com_faixa_invertida_nao_quebra():
+    indice = CepCoverageIndex(_receitas((34, 30)))
+
+    assert len(indice.rows_for_cep(32)) == 1
+    por_cep = indice.receita_por_cep()
+    assert por_cep["CEP"].tolist() == [30, 31, 32, 33, 34]
+    assert por_cep["RECEITA_RATEADA"].sum() == 100.0
+
+
+def test_ceps_legado_em_lista():
+    receitas = pd.DataFrame({"DATA": ["2024-01-02"], "VALOR_TOTAL": [10.0], "CEPS": ["30, 31, 32"]})
+
+    assert parse_ceps("030-034") == (30, 34)
+    assert cep_ranges(receitas)[["CEP_INICIO", "CEP_FIM"]].values.tolist() == [[30, 32]]
+
+
+def test_indice_bate_com_varredura_nos_dados_sinteticos():
+    receitas = generate_tables(SCALES["1_ano"])["RECEITAS"]
+    indice = CepCoverageIndex(receitas)
+
+    for cep in (10, 42, 93):
+        esperado = receitas[(receitas["CEP_INICIO"] <= cep) & (receitas["CEP_FIM"] >= cep)]
+        assert sorted(indice.rows_for_cep(cep)["DATA"]) == sorted(esperado["DATA"])
+
+    por_cep = indice.receita_por_cep()
+    assert por_cep["RECEITA_RATEADA"].sum() == pytest.approx(receitas["VALOR_TOTAL"].sum())
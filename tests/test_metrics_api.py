@@ -0,0 +1,24 @@
+from api.metrics_api import etag_matches
+
+
+ETAG = '"v3-geral-30d"'
+
+
+def test_etag_igual():
+    assert etag_matches(ETAG, ETAG)
+
+
+def test_etag_fraco():
+    assert etag_matches(ETAG, f"W/{ETAG}")
+    assert etag_matches(f"W/{ETAG}", ETAG)
+
+
+def test_etag_em_lista_e_curinga():
+    assert etag_matches(ETAG, f'"v2-geral-30d", {ETAG}')
+    assert etag_matches(ETAG, "*")
+
+
+def test_etag_diferente_ou_ausente():
+    assert not etag_matches(ETAG, '"v2-geral-30d"')
+    assert not etag_matches(ETAG, None)
+    assert not etag_matches(ETAG, "")
@@ -0,0 +1,71 @@
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from queries.rolling_metrics import RollingMetrics, daily_delta
+from synthetic_data import SCALES, generate_tables
+
+
+def _diario(inicio, fim, valor=10.0):
+    datas = pd.date_range(inicio, fim, freq="D")
+    return pd.DataFrame({"DATA": datas, "VALOR_TOTAL": valor})
+
+
+def test_apply_delta_igual_ao_calculo_completo():
+    tabelas = generate_tables(SCALES["1_ano"])
+    receitas, despesas = tabelas["RECEITAS"], tabelas["DESPESAS"]
+    corte = receitas["DATA"].max() - pd.Timedelta(days=20)
+
+    base = RollingMetrics.from_frames(receitas[receitas["DATA"] <= corte], despesas[despesas["DATA"] <= corte])
+    incremental = base.apply_delta(daily_delta(receitas[receitas["DATA"] > corte], despesas[despesas["DATA"] > corte]))
+    completo = RollingMetrics.from_frames(receitas, despesas)
+
+    pdt.assert_frame_equal(incremental.series(), completo.series())
+    pdt.assert_frame_equal(incremental.monthly_growth(), completo.monthly_growth())
+    # blocos anteriores ao primeiro dia alterado são compartilhados com a versão anterior
+    assert incremental.blocos[0] is base.blocos[0]
+
+
+def test_apply_delta_antes_do_inicio_refaz_a_serie():
+    base = RollingMetrics.from_frames(_diario("2026-02-01", "2026-02-28"), None)
+    nova = base.apply_delta(daily_delta(_diario("2026-01-30", "2026-01-31")))
+
+    assert nova.inicio == pd.Timestamp("2026-01-30")
+    assert len(nova) == 30
+    assert nova.series()["RECEITA"].sum() == 300.0
+
+
+def test_month_to_date_compara_mesmos_dias_do_mes_anterior():
+    metricas = RollingMetrics.from_frames(_diario("2026-01-01", "2026-03-15"), None)
+
+    resultado = metricas.month_to_date(hoje="2026-03-15")
+
+    assert resultado["PARCIAL"] and resultado["DIAS"] == 15
+    assert resultado["RECEITA"] == 150.0
+    assert resultado["ANTERIOR_RECEITA"] == 150.0
+    assert resultado["CRESC_RECEITA"] == 0.0
+
+
+def test_month_to_date_mes_encerrado_compara_meses_inteiros():
+    metricas = RollingMetrics.from_frames(_diario("2026-01-01", "2026-03-31"), None)
+
+    resultado = metricas.month_to_date(hoje="2026-04-10")
+
+    assert not resultado["PARCIAL"] and resultado["DIAS"] == 31
+    assert resultado["RECEITA"] == 310.0
+    assert resultado["ANTERIOR_RECEITA"] == 280.0
+    assert resultado["CRESC_RECEITA"] == pytest.approx(30 / 280 * 100)
+
+
+def test_month_to_date_mes_anterior_mais_curto():
+    metricas = RollingMetrics.from_frames(_diario("2026-02-01", "2026-03-31"), None)
+
+    resultado = metricas.month_to_date(hoje="2026-03-31")
+
+    # 31 dias de março contra fevereiro inteiro (28)
+    assert resultado["PARCIAL"] and resultado["DIAS"] == 31
+    assert resultado["ANTERIOR_RECEITA"] == 280.0
+
+
+def test_month_to_date_sem_dados():
+    assert RollingMetrics().month_to_date() is None
@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from queries.rollups import CHAVES, COLUNAS_SOMA, TABELA_RESUMO, combine_routes, ensure_rollup_schema, read_rollup, rebuild_rollups
+from queries.romaneio import append_dfs_to_bq
+from synthetic_data import SCALES, generate_tables, seed_backend
+
+
+def _tabelas(tabelas, filtro):
+    return {f"SBOX_ISRAEL.{nome}": df[filtro(df)] for nome, df in tabelas.items()}
+
+
+def _total_receitas(backend):
+    return backend.query("SELECT SUM(VALOR_TOTAL) AS TOTAL FROM SBOX_ISRAEL.RECEITAS")["TOTAL"].iloc[0]
+
+
+def test_append_atualiza_resumo_com_um_merge(backend):
+    tabelas = generate_tables(SCALES["1_mes"])
+    corte = tabelas["RECEITAS"]["DATA"].max() - pd.Timedelta(days=5)
+    seed_backend(backend, {nome: df[df["DATA"] <= corte] for nome, df in tabelas.items()})
+
+    append_dfs_to_bq(backend, _tabelas(tabelas, lambda df: df["DATA"] > corte))
+
+    resumo = read_rollup(backend)
+    assert resumo["RECEITA"].sum() == pytest.approx(_total_receitas(backend))
+    assert resumo["N_ROMANEIOS"].sum() == len(tabelas["RECEITAS"])
+    assert not resumo.duplicated(CHAVES).any()
+
+
+def test_resumo_sem_rota_e_recriado_antes_do_append(backend):
+    tabelas = generate_tables(SCALES["1_mes"])
+    corte = tabelas["RECEITAS"]["DATA"].max() - pd.Timedelta(days=5)
+    seed_backend(backend, {nome: df[df["DATA"] <= corte] for nome, df in tabelas.items()}, resumos=False)
+
+    # resumo no formato antigo: uma linha por dia, chave só BUCKET
+    rebuild_rollups(backend)
+    antigo = combine_routes(read_rollup(backend))
+    antigo["CREATED_AT"] = pd.Timestamp("2026-01-01")
+    backend.replace_df(antigo.head(0), TABELA_RESUMO)
+    backend.merge_sum(antigo, TABELA_RESUMO, chaves=["BUCKET"], soma=COLUNAS_SOMA)
+    assert "ROTA" not in backend.table_columns(TABELA_RESUMO)
+
+    append_dfs_to_bq(backend, _tabelas(tabelas, lambda df: df["DATA"] > corte))
+
+    assert "ROTA" in backend.table_columns(TABELA_RESUMO)
+    resumo = read_rollup(backend)
+    assert resumo["RECEITA"].sum() == pytest.approx(_total_receitas(backend))
+    assert resumo["N_ROMANEIOS"].sum() == len(tabelas["RECEITAS"])
+
+
+def test_ensure_rollup_schema_sem_tabela_ou_ja_migrado(backend):
+    assert not ensure_rollup_schema(backend)
+
+    seed_backend(backend, generate_tables(SCALES["1_mes"]))
+
+    assert not ensure_rollup_schema(backend)
@@ -0,0 +1,29 @@
+import numpy as np
+
+from frontend.time_buckets import lttb
+
+
+def test_lttb_mantem_extremos_e_quantidade():
+    x = np.arange(1000)
+    y = np.sin(x / 50)
+
+    indices = lttb(x, y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 999
+    assert (np.diff(indices) > 0).all()
+
+
+def test_lttb_preserva_pico():
+    x = np.arange(500)
+    y = np.zeros(500)
+    y[237] = 100.0
+
+    assert 237 in lttb(x, y, 20)
+
+
+def test_lttb_sem_reducao():
+    x = np.arange(10)
+
+    assert lttb(x, x, 10).tolist() == list(range(10))
+    assert lttb(x, x, 50).tolist() == list(range(10))
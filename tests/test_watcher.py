@@ -0,0 +1,85 @@
+import json
+from datetime import date
+
+import pytest
+
+from ingestion.watcher import IngestionWatcher, infer_year
+from synthetic_data import generate_romaneio_texts
+
+
+def test_ano_do_chat():
+    assert infer_year("[15/12/2025, 18:32] Israel: Romaneio 15/12\n") == 2025
+
+
+def test_romaneio_de_31_12_enviado_no_ano_novo():
+    assert infer_year("[01/01/2027, 08:00] Israel: Romaneio 31/12\n") == 2026
+
+
+def test_ano_com_dois_digitos():
+    assert infer_year("15/12/25 18:32 - Israel: Romaneio 14/12\n", hoje=date(2030, 1, 1)) == 2025
+
+
+def test_sem_data_do_chat_usa_hoje():
+    assert infer_year("Romaneio 31/12\n", hoje=date(2027, 1, 1)) == 2026
+    assert infer_year("Romaneio 01/01\n", hoje=date(2027, 1, 1)) == 2027
+
+
+def _mensagem(texto, ano):
+    cabecalho, resto = texto.split("\n", 1)
+    dia, mes = cabecalho.split()[1].split("/")
+    return f"[{dia}/{mes}/{ano}, 18:32] Israel: {cabecalho}\n{resto}"
+
+
+def _escrever(caminho, textos, modo="a"):
+    with open(caminho, modo, encoding="utf-8") as arquivo:
+        for texto, ano in textos:
+            arquivo.write(_mensagem(texto, ano))
+            arquivo.write("[x] Fulano: ok\n")
+
+
+def _contagens(backend):
+    receitas = backend.query("SELECT COUNT(*) AS N, SUM(VALOR_TOTAL) AS TOTAL FROM SBOX_ISRAEL.RECEITAS")
+    resumo = backend.query("SELECT SUM(N_ROMANEIOS) AS N, SUM(RECEITA) AS TOTAL FROM SBOX_ISRAEL.RESUMO_DIARIO")
+    return receitas.iloc[0], resumo.iloc[0]
+
+
+def test_segunda_passada_nao_regrava(tmp_path, backend):
+    chat = tmp_path / "chat.txt"
+    _escrever(chat, generate_romaneio_texts(10), "w")
+
+    assert IngestionWatcher(str(chat), backend, silencio=0, lote=4).run_once() == 10
+    assert IngestionWatcher(str(chat), backend, silencio=0, lote=4).run_once() == 0
+
+    receitas, resumo = _contagens(backend)
+    assert receitas["N"] == resumo["N"] == 10
+
+
+def test_retoma_lote_interrompido_sem_duplicar(tmp_path, backend, monkeypatch):
+    chat = tmp_path / "chat.txt"
+    textos = generate_romaneio_texts(8)
+    _escrever(chat, textos[:5], "w")
+    IngestionWatcher(str(chat), backend, silencio=0).run_once()
+    _escrever(chat, textos[5:])
+
+    append_df = backend.append_df
+
+    def queda(df, table_id):
+        if table_id.endswith("DESPESAS"):
+            raise RuntimeError("queda")
+        append_df(df, table_id)
+
+    monkeypatch.setattr(backend, "append_df", queda)
+    with pytest.raises(RuntimeError):
+        IngestionWatcher(str(chat), backend, silencio=0).run_once()
+    monkeypatch.undo()
+
+    pendente = json.loads((tmp_path / "chat.txt.checkpoint.json").read_text())["pendente"]
+    assert pendente["tabelas"] == ["receitas"]
+
+    assert IngestionWatcher(str(chat), backend, silencio=0).run_once() == 3
+
+    receitas, resumo = _contagens(backend)
+    assert receitas["N"] == resumo["N"] == 8
+    assert receitas["TOTAL"] == pytest.approx(resumo["TOTAL"])
+    despesas = backend.query("SELECT SUM(VALOR) AS TOTAL FROM SBOX_ISRAEL.DESPESAS")["TOTAL"].iloc[0]
+    assert despesas == pytest.approx(backend.query("SELECT SUM(DESPESAS) AS TOTAL FROM SBOX_ISRAEL.RESUMO_DIARIO")["TOTAL"].iloc[0])